@@ -2,4 +2,18 @@ from pathlib import Path
 
 import diskcache
 
-cache = diskcache.Cache(str(Path(__file__).parent.parent / ".finmas_cache"))
+from finmas.constants import defaults
+
+CACHE_DIR = Path(__file__).parent.parent / ".finmas_cache"
+
+cache = diskcache.Cache(str(CACHE_DIR))
+
+# Content-addressed embeddings shared by all vector store index builds
+embedding_cache = diskcache.Cache(
+    str(CACHE_DIR / "embeddings"),
+    size_limit=int(defaults["embedding_cache_size_limit_mb"] * 1024**2),
+    eviction_policy="least-recently-used",
+)
+
+# Pending and failed fundamentals download jobs, which persist across runs
+fundamentals_queue = diskcache.Index(str(CACHE_DIR / "fundamentals_queue"))
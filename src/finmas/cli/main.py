@@ -8,7 +8,7 @@ import typer
 from rich import print
 
 from finmas.constants import defaults
-from finmas.data.market.alpha_vantage import get_fundamental_data
+from finmas.data.market.fundamentals_store import migrate_all_legacy_fundamentals
 from finmas.data.news.benzinga_news import BenzingaNewsFetcher
 from finmas.utils.common import to_datetime
 
@@ -22,45 +22,117 @@ class FrequencyEnum(StrEnum):
 
 @app.command()
 def download_fundamentals(
-    ticker: Annotated[str, typer.Argument(help="Stock ticker to load fundamentals for")],
+    tickers: Annotated[
+        list[str] | None, typer.Argument(help="Stock tickers to load fundamentals for")
+    ] = None,
+    sp500: Annotated[bool, typer.Option(help="Load fundamentals for the S&P 500")] = False,
+    types: Annotated[
+        list[str] | None,
+        typer.Option(
+            "--type",
+            help="Types of data: income, balance, cash_flow or earnings. Defaults to all",
+        ),
+    ] = None,
     freq: Annotated[
         FrequencyEnum, typer.Option(help="Annual or Quarterly")
     ] = FrequencyEnum.QUARTERLY,
+    force: Annotated[bool, typer.Option(help="Download data that is already stored")] = False,
+    retry_failed: Annotated[bool, typer.Option(help="Retry the failed jobs in the queue")] = False,
 ) -> None:
     """
-    Download fundamental data for a given stock ticker with Alpha Vantage.
+    Download fundamental data for a list of stock tickers with Alpha Vantage.
 
-    The data is saved as a CSV file in the data directory with the ticker as subfolder.
-    Both income statement and balance sheet data are downloaded.
+    The tickers are added to a persistent download queue, and the queue is processed within
+    the Alpha Vantage rate limits. The data is stored in the Parquet fundamentals store.
+    When the daily limit is reached, the command can be rerun to resume the downloads.
     """
-    fundamentals_dir = Path(defaults["data_dir"]) / "fundamentals" / ticker
-    fundamentals_dir.mkdir(parents=True, exist_ok=True)
-    for type in ["income", "balance"]:
-        df = get_fundamental_data(ticker, type, freq.value)
-        if df.empty:
-            print(f"No data found for ticker '{ticker}'")
-            return
+    import os
 
-        file_path = fundamentals_dir / f"{type}_{freq.value.lower()}.csv"
-        if not file_path.exists():
-            df.to_csv(file_path)
-            print(f"Fundamental data for '{ticker}' stored in '{fundamentals_dir}'")
+    from finmas.data.market.fundamentals_downloader import (
+        enqueue_fundamentals_jobs,
+        get_fundamentals_queue_df,
+        reset_failed_fundamentals_jobs,
+        run_fundamentals_queue,
+    )
+    from finmas.utils.common import get_tickers_df
+
+    if os.getenv("ALPHAVANTAGE_API_KEY") is None:
+        print("ALPHAVANTAGE_API_KEY environment variable not set.")
+        raise typer.Exit(code=1)
+
+    if sp500:
+        tickers = get_tickers_df(sp500=True)["ticker"].tolist()
+    if tickers:
+        num_added = enqueue_fundamentals_jobs(
+            [ticker.upper() for ticker in tickers], types=types, freqs=[freq.value], force=force
+        )
+        print(f"Added {num_added} download jobs to the queue")
+    if retry_failed:
+        print(f"Reset {reset_failed_fundamentals_jobs()} failed download jobs")
+
+    counts = run_fundamentals_queue()
+    print(counts)
+
+    failed_df = get_fundamentals_queue_df().query("status == 'failed'")
+    if not failed_df.empty:
+        print(failed_df.to_string(index=False))
+
+
+@app.command()
+def migrate_fundamentals() -> None:
+    """Convert the fundamental data stored as CSV files to the Parquet fundamentals store."""
+    num_migrated = migrate_all_legacy_fundamentals()
+    print(f"Migrated {num_migrated} CSV files to '{defaults['fundamentals_dir']}'")
+
+
+@app.command()
+def screen(
+    query: Annotated[
+        str | None,
+        typer.Option(
+            help="Query to filter tickers with, e.g. 'pe_ttm < 20 and revenue_ttm_yoy > 10'"
+        ),
+    ] = None,
+    as_of: Annotated[
+        str | None,
+        typer.Option(help="As-of date. By default the fiscal quarters are not restricted"),
+    ] = None,
+    sort_by: Annotated[str, typer.Option(help="Column to sort the tickers by")] = "pe_ttm",
+) -> None:
+    """
+    Screen the tickers in the local fundamentals store with essential metrics.
+
+    The metrics of the latest fiscal quarter are computed for all tickers at once.
+    Growth rates and margins are in percent.
+    """
+    from finmas.data.market.screener import SCREENER_COLS_MAP, screen_tickers
+
+    try:
+        df = screen_tickers(query, as_of=as_of)
+    except Exception as e:
+        print(f"Invalid query '{query}': {e}")
+        print(f"Available columns: {', '.join(SCREENER_COLS_MAP.values())}")
+        raise typer.Exit(code=1) from e
+
+    print(df.sort_values(sort_by).to_string(float_format="{:,.2f}".format))
 
 
 @app.command()
 def download_news(
-    ticker: Annotated[str, typer.Argument(help="Stock ticker to load news for")],
+    tickers: Annotated[
+        list[str] | None,
+        typer.Argument(help="Stock tickers to load news for. Defaults to the watchlist"),
+    ] = None,
     start: Annotated[str | None, typer.Option(help="Start date for news")] = None,
     end: Annotated[str | None, typer.Option(help="End date for news")] = None,
 ) -> None:
     """
-    Download news for a given stock ticker from Alpaca News API (Benzinga News Source).
+    Download news for a watchlist of stock tickers from Alpaca News API (Benzinga News Source).
 
-    The data is saved as a CSV file in the data directory with the ticker as subfolder.
+    The tickers are fetched together with combined symbol requests, and the articles are
+    stored once in the news store.
     """
-    news_dir = Path(defaults["data_dir"]) / "news" / ticker
-    news_dir.mkdir(parents=True, exist_ok=True)
-
+    tickers = [ticker.upper() for ticker in tickers or defaults["watchlist"]]
     news_fetcher = BenzingaNewsFetcher()
 
     if start is None:
@@ -68,24 +140,67 @@ def download_news(
     if end is None:
         end = defaults["news_end_date"]
 
-    news_records = news_fetcher.get_news(ticker, start=to_datetime(start), end=to_datetime(end))
-    if not news_records:
-        print(f"No news found for ticker '{ticker}'")
-        return
+    news_by_ticker = news_fetcher.get_watchlist_news(
+        tickers, start=to_datetime(start), end=to_datetime(end)
+    )
+    for ticker, news_records in news_by_ticker.items():
+        if not news_records:
+            print(f"No news found for ticker '{ticker}'")
+            continue
+
+        df = pd.DataFrame(news_records)
+        df["published"] = df["published"].dt.strftime("%Y-%m-%d")
+
+        print(ticker)
+        print(df)
+
+
+@app.command()
+def refresh_prices(
+    tickers: Annotated[
+        list[str] | None, typer.Argument(help="Tickers to refresh. Defaults to the watchlist")
+    ] = None,
+) -> None:
+    """
+    Refresh the stored daily prices for a watchlist of tickers.
 
-    df = pd.DataFrame(news_records)
-    df["published"] = df["published"].dt.strftime("%Y-%m-%d")
+    Only the bars after the last stored date are fetched from Tiingo. The full history of a
+    ticker is refetched when a split or dividend has changed the adjusted prices.
+    """
+    from finmas.data.market.tiingo import refresh_price_data
+
+    tickers = tickers or defaults["watchlist"]
+    records = []
+    for ticker in tickers:
+        ticker = ticker.upper()
+        try:
+            records.append(dict(ticker=ticker, action=refresh_price_data(ticker)))
+        except Exception as e:
+            print(f"Could not refresh prices for '{ticker}': {e}")
+            records.append(dict(ticker=ticker, action="failed"))
 
-    print(df)
+    print(pd.DataFrame(records).to_string(index=False))
 
 
 @app.command()
 def clean_up():
-    """Clean up data folders for news."""
+    """Clean up the news store and the legacy news folders."""
+    from finmas.data.news.news_store import delete_symbol, get_news_store_summary
+
     print("Cleaning news data...")
-    # News
-    if typer.confirm("Do you want to clean the news data?", default=False):
-        news_dir = Path(defaults["data_dir"]) / "benzinga_news"
+    # News store
+    if typer.confirm("Do you want to clean the news store?", default=False):
+        for summary in get_news_store_summary():
+            pprint(summary)
+            if typer.confirm(f"Delete the news for '{summary['symbol']}'?", default=False):
+                delete_symbol(summary["symbol"])
+                print("Deleted news for:", summary["symbol"])
+
+    # Legacy news folders with one pickle file per date range
+    news_dir = Path(defaults["data_dir"]) / "benzinga_news"
+    if news_dir.exists() and typer.confirm(
+        "Do you want to clean the legacy news folders?", default=False
+    ):
         for folder in news_dir.iterdir():
             if folder.is_dir():
                 files = [str(f) for f in folder.iterdir()]
@@ -97,5 +212,158 @@ def clean_up():
                     print("Deleted folder:", folder)
 
 
+@app.command()
+def prefetch_filings(
+    tickers: Annotated[
+        list[str] | None, typer.Argument(help="Tickers to prefetch SEC filings for")
+    ] = None,
+    sp500: Annotated[bool, typer.Option(help="Prefetch SEC filings for the S&P 500")] = False,
+    form: Annotated[
+        list[str] | None, typer.Option(help="Filing types to prefetch, e.g. 10-K")
+    ] = None,
+    latest: Annotated[int, typer.Option(help="Number of latest filings per ticker")] = 4,
+    max_workers: Annotated[int | None, typer.Option(help="Number of concurrent downloads")] = None,
+) -> None:
+    """
+    Download the latest SEC filings for a list of tickers or the S&P 500.
+
+    The filings are stored in the filings directory with the ticker and filing type as subfolders.
+    Filings that are already stored are skipped, so the command can be rerun to resume.
+    """
+    from finmas.data.sec.filings import prefetch_filings as _prefetch_filings
+    from finmas.utils.common import get_tickers_df
+
+    if sp500:
+        tickers = get_tickers_df(sp500=True)["ticker"].tolist()
+    if not tickers:
+        print("Provide a list of tickers or use --sp500")
+        raise typer.Exit(code=1)
+
+    df = _prefetch_filings(
+        [ticker.upper() for ticker in tickers],
+        filing_types=form,
+        latest=latest,
+        max_workers=max_workers,
+    )
+    df.loc["Total"] = df.sum()
+    print(df.to_string())
+
+
+@app.command()
+def benchmark_sec_cleaner(
+    ticker: Annotated[
+        str | None, typer.Argument(help="Only benchmark filings for this ticker")
+    ] = None,
+    repeat: Annotated[int, typer.Option(help="Number of timed runs per cleaner")] = 1,
+) -> None:
+    """
+    Benchmark the BeautifulSoup and lxml cleaners for SEC filings.
+
+    The cleaners are run on the filings recorded in the filings directory.
+    For each filing the best time of each cleaner is reported, together with whether
+    the cleaned HTML is identical and whether the extracted text is identical.
+    """
+    import time
+
+    from bs4 import BeautifulSoup
+
+    from finmas.data.sec.sec_parser import SEC_HTML_CLEANERS, clean_filing_html
+
+    filings_dir = Path(defaults["filings_dir"])
+    filing_paths = sorted(
+        path
+        for path in filings_dir.glob(f"{ticker or '*'}/*/*.htm*")
+        if not path.name.endswith(".refined.html")
+    )
+    if not filing_paths:
+        print(f"No recorded filings found in '{filings_dir}'")
+        return
+
+    def get_text(html: str) -> str:
+        return " ".join(BeautifulSoup(html, "html.parser").get_text().split())
+
+    records = []
+    for path in filing_paths:
+        html_content = path.read_text(encoding="utf-8")
+        record: dict = dict(filing=str(path.relative_to(filings_dir)))
+        record["size_kb"] = round(len(html_content) / 1024)
+        cleaned = {}
+        for cleaner in SEC_HTML_CLEANERS:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                cleaned[cleaner] = clean_filing_html(html_content, cleaner=cleaner)
+                timings.append(time.perf_counter() - start)
+            record[f"{cleaner}_seconds"] = round(min(timings), 3)
+        record["speedup"] = round(record["bs4_seconds"] / record["lxml_seconds"], 1)
+        record["identical_html"] = cleaned["bs4"] == cleaned["lxml"]
+        record["identical_text"] = get_text(cleaned["bs4"]) == get_text(cleaned["lxml"])
+        records.append(record)
+
+    print(pd.DataFrame(records).to_string(index=False))
+
+
+@app.command()
+def benchmark_news_cleaner(
+    limit: Annotated[int | None, typer.Option(help="Number of latest stored articles")] = None,
+    repeat: Annotated[int, typer.Option(help="Number of timed runs per cleaner")] = 3,
+) -> None:
+    """
+    Benchmark the legacy and compiled text cleaners for news articles.
+
+    The cleaners are run on the paragraphs and headlines of the articles recorded in the
+    news store. The HTML is parsed before the timing starts. For each cleaner the best time
+    is reported, together with whether the output is identical to the legacy cleaner.
+    """
+    import time
+
+    from bs4 import BeautifulSoup
+
+    from finmas.data.news.news_store import read_article_contents
+    from finmas.data.news.text_cleaner import NEWS_TEXT_CLEANERS, NewsTextCleaner
+
+    articles = read_article_contents(limit=limit)
+    if not articles:
+        print(f"No recorded articles found in '{defaults['news_store_path']}'")
+        return
+
+    headlines = [article["title"] for article in articles]
+    paragraphs: list[str] = []
+    for article in articles:
+        soup = BeautifulSoup(article["content"], "html.parser")
+        for table in soup.find_all("table"):
+            table.decompose()
+        paragraphs.extend(tag.text for tag in soup.find_all(["p", "ul"]))
+
+    records = []
+    outputs = {}
+    for cleaner in NEWS_TEXT_CLEANERS:
+        text_cleaner = NewsTextCleaner(
+            defaults["news_sentences_ignore_list"],
+            defaults["news_headline_ignore_list"],
+            cleaner=cleaner,
+        )
+        record: dict = dict(cleaner=cleaner)
+        for name, func, items in [
+            ("sentences", text_cleaner.get_sentences, paragraphs),
+            ("headlines", text_cleaner.is_ignored_headline, headlines),
+        ]:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                outputs[cleaner, name] = [func(item) for item in items]
+                timings.append(time.perf_counter() - start)
+            record[f"{name}_seconds"] = round(min(timings), 4)
+            record[f"identical_{name}"] = outputs[cleaner, name] == outputs["legacy", name]
+        records.append(record)
+
+    df = pd.DataFrame(records).set_index("cleaner")
+    df["speedup"] = (
+        df.loc["legacy", "sentences_seconds"] / df["sentences_seconds"].clip(lower=1e-6)
+    ).round(1)
+    print(f"{len(articles)} articles, {len(paragraphs)} paragraphs")
+    print(df.to_string())
+
+
 if __name__ == "__main__":
     app()
@@ -4,6 +4,8 @@ import yaml
 
 CONFIG_FILE = "config.yaml"
 DOCS_URL = "https://ivarurdalen.github.io/finmas/"
+# Identity sent as User-Agent in requests to SEC EDGAR
+SEC_IDENTITY = "John Doe john.doe@example.com"
 INCOME_STATEMENT_COLS = ["totalRevenue", "operatingExpenses", "grossProfit", "netIncome"]
 
 # Tickers Table
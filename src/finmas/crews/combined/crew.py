@@ -1,5 +1,6 @@
 import datetime as dt
 import time
+from functools import partial
 
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
@@ -8,7 +9,7 @@ from edgar import Filing
 
 from finmas.constants import agent_config, defaults
 from finmas.crews.model_provider import get_crewai_llm_model
-from finmas.crews.utils import CombinedCrewConfiguration, get_log_filename
+from finmas.crews.utils import CombinedCrewConfiguration, get_log_filename, run_concurrently
 from finmas.data.market import StockFundamentalsTool, TechnicalAnalysisTool
 from finmas.data.news.query_engine import get_news_query_engine
 from finmas.data.sec.query_engine import get_sec_query_engine
@@ -53,22 +54,43 @@ class CombinedCrew:
         similarity_top_k: int = defaults["similarity_top_k"],
         async_execution: bool = True,
         price_end_date: dt.date | None = None,
+        as_of: dt.date | None = None,
     ):
         start = time.time()
         self.crewai_llm = get_crewai_llm_model(
             llm_provider, llm_model, temperature=temperature, max_tokens=max_tokens
         )
-        # News
-        self.news_query_engine, self.news_index_creation_metrics = get_news_query_engine(
-            ticker,
-            records,
-            llm_provider,
-            llm_model,
-            embedding_model,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            similarity_top_k=similarity_top_k,
+        # News and SEC Filing indexes are independent and are created concurrently
+        results = run_concurrently(
+            {
+                "news": partial(
+                    get_news_query_engine,
+                    ticker,
+                    records,
+                    llm_provider,
+                    llm_model,
+                    embedding_model,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    similarity_top_k=similarity_top_k,
+                ),
+                "sec": partial(
+                    get_sec_query_engine,
+                    ticker,
+                    llm_provider,
+                    llm_model,
+                    embedding_model,
+                    filing=filing,
+                    method="section:mda",
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    similarity_top_k=similarity_top_k,
+                ),
+            }
         )
+
+        # News
+        self.news_query_engine, self.news_index_creation_metrics = results["news"]
         self.news_tool = LlamaIndexTool.from_query_engine(
             self.news_query_engine,
             name=f"News Query Tool for {ticker}",
@@ -76,17 +98,7 @@ class CombinedCrew:
         )
 
         # SEC Filing
-        self.sec_query_engine, self.sec_index_creation_metrics = get_sec_query_engine(
-            ticker,
-            llm_provider,
-            llm_model,
-            embedding_model,
-            filing=filing,
-            method="section:mda",
-            temperature=temperature,
-            max_tokens=max_tokens,
-            similarity_top_k=similarity_top_k,
-        )
+        self.sec_query_engine, self.sec_index_creation_metrics = results["sec"]
         self.sec_tool = LlamaIndexTool.from_query_engine(
             self.sec_query_engine,
             name=f"{filing.form} SEC Filing Query Tool for {ticker}",
@@ -94,7 +106,7 @@ class CombinedCrew:
         )
 
         # Market Data
-        self.stock_fundamentals_tool = StockFundamentalsTool()
+        self.stock_fundamentals_tool = StockFundamentalsTool(as_of=as_of)
         self.technical_analysis_tool = TechnicalAnalysisTool(end_date=price_end_date)
 
         self.config = CombinedCrewConfiguration(
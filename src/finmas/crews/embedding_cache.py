@@ -0,0 +1,113 @@
+import hashlib
+import threading
+from array import array
+from typing import Any
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from pydantic import PrivateAttr
+
+from finmas.cache_config import embedding_cache
+
+
+def get_embedding_cache_key(model_name: str, text: str) -> str:
+    """
+    Returns the cache key for the embedding of a text chunk.
+
+    The text is normalized by collapsing whitespace, so that chunks that only differ in
+    whitespace share the same embedding.
+    """
+    normalized_text = " ".join(text.split())
+    text_hash = hashlib.sha256(normalized_text.encode("utf-8")).hexdigest()
+    return f"{model_name}:{text_hash}"
+
+
+class CachedEmbedding(BaseEmbedding):
+    """
+    Embedding model wrapper that caches text embeddings on disk.
+
+    Text embeddings are looked up by embedding model and the hash of the normalized chunk text,
+    and only the chunks that are missing from the cache are sent to the wrapped model.
+    Query embeddings are passed directly to the wrapped model.
+    """
+
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _cache: Any = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _cache_hits: int = PrivateAttr(default=0)
+    _cache_misses: int = PrivateAttr(default=0)
+    _cache_miss_tokens: int = PrivateAttr(default=0)
+
+    def __init__(self, embed_model: BaseEmbedding, cache: Any = embedding_cache, **kwargs: Any):
+        super().__init__(
+            model_name=embed_model.model_name,
+            embed_batch_size=embed_model.embed_batch_size,
+            **kwargs,
+        )
+        self._embed_model = embed_model
+        self._cache = cache
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def cache_hits(self) -> int:
+        """Number of text embeddings found in the cache."""
+        return self._cache_hits
+
+    @property
+    def cache_misses(self) -> int:
+        """Number of text embeddings computed by the wrapped embedding model."""
+        return self._cache_misses
+
+    @property
+    def cache_miss_token_count(self) -> int:
+        """Number of tokens in the texts embedded by the wrapped embedding model."""
+        return self._cache_miss_tokens
+
+    def reset_counts(self) -> None:
+        """Reset the cache hit, miss and token counts."""
+        with self._lock:
+            self._cache_hits = 0
+            self._cache_misses = 0
+            self._cache_miss_tokens = 0
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._embed_model._get_query_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return await self._embed_model._aget_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        return self._get_text_embeddings(texts)
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        keys = [get_embedding_cache_key(self.model_name, text) for text in texts]
+        embeddings: list[Embedding | None] = []
+        for key in keys:
+            value = self._cache.get(key)
+            embeddings.append(array("d", value).tolist() if value is not None else None)
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        missing_tokens = 0
+        if missing:
+            from finmas.data.token_counting import token_counter
+
+            missing_tokens = sum(len(token_counter.tokenizer(texts[i])) for i in missing)
+            new_embeddings = self._embed_model._get_text_embeddings([texts[i] for i in missing])
+            for i, embedding in zip(missing, new_embeddings, strict=True):
+                embeddings[i] = embedding
+                self._cache.set(keys[i], array("d", embedding).tobytes())
+
+        with self._lock:
+            self._cache_hits += len(texts) - len(missing)
+            self._cache_misses += len(missing)
+            self._cache_miss_tokens += missing_tokens
+
+        return embeddings  # type: ignore[return-value]
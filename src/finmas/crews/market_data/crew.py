@@ -35,11 +35,12 @@ class MarketDataCrew:
         max_tokens: int = defaults["llm_max_tokens"],
         async_execution: bool = True,
         price_end_date: dt.date | None = None,
+        as_of: dt.date | None = None,
     ):
         self.crewai_llm = get_crewai_llm_model(
             llm_provider, llm_model, temperature=temperature, max_tokens=max_tokens
         )
-        self.stock_fundamentals_tool = StockFundamentalsTool()
+        self.stock_fundamentals_tool = StockFundamentalsTool(as_of=as_of)
         self.technical_analysis_tool = TechnicalAnalysisTool(end_date=price_end_date)
 
         self.config = CrewConfiguration(
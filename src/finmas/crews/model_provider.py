@@ -1,9 +1,17 @@
 import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 from finmas.constants import defaults
+from finmas.logger import get_logger
 from finmas.utils.common import get_environment_variable, get_valid_models
 
+logger = get_logger(__name__)
+
 
 def validate_llm_info(llm_provider: str, llm_model: str) -> None:
     if llm_provider not in ["groq", "huggingface", "openai"]:
@@ -68,8 +76,81 @@ def get_llama_index_llm(
         return OpenAI(model=llm_model, **config)
 
 
-def get_hf_embedding_model(model_name: str | None = None):
-    """Get a HuggingFace embedding model."""
+@dataclass
+class LoadedEmbeddingModel:
+    name: str
+    model: Any
+    load_time: float
+    size_bytes: int
+
+
+def get_model_size_bytes(embed_model: Any) -> int:
+    """Returns the resident size in bytes of the parameters and buffers of a HuggingFace embedding model."""
+    model = getattr(embed_model, "_model", None)
+    if model is None or not hasattr(model, "parameters"):
+        return 0
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+class EmbeddingModelRegistry:
+    """
+    Process-wide registry of loaded HuggingFace embedding models.
+
+    Models are kept in memory keyed by model name, so that each model is loaded only once.
+    When the total resident size exceeds the memory budget, the least recently used models
+    are evicted from the registry.
+    """
+
+    def __init__(self, max_memory_mb: float) -> None:
+        self.max_memory_bytes = int(max_memory_mb * 1024**2)
+        self._models: OrderedDict[str, LoadedEmbeddingModel] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str) -> Any:
+        """Returns the embedding model with the given name, loading it if necessary."""
+        with self._lock:
+            if model_name in self._models:
+                self._models.move_to_end(model_name)
+                return self._models[model_name].model
+
+            loaded_model = _load_hf_embedding_model(model_name)
+            self._models[model_name] = loaded_model
+            self._evict(keep=model_name)
+            return loaded_model.model
+
+    def _evict(self, keep: str) -> None:
+        """Evict least recently used models until the registry is within the memory budget."""
+        while self.total_size_bytes > self.max_memory_bytes and len(self._models) > 1:
+            name = next(iter(self._models))
+            if name == keep:
+                break
+            evicted = self._models.pop(name)
+            logger.info(
+                f"Evicted embedding model '{name}' ({evicted.size_bytes / 1024**2:.0f} MB) "
+                "from the registry"
+            )
+
+    @property
+    def total_size_bytes(self) -> int:
+        """Total resident size in bytes of the loaded embedding models."""
+        return sum(loaded.size_bytes for loaded in self._models.values())
+
+    def stats(self) -> list[dict]:
+        """Returns load time and resident size for each loaded model, most recently used last."""
+        with self._lock:
+            return [
+                dict(
+                    name=loaded.name,
+                    load_time=round(loaded.load_time, 2),
+                    size_mb=round(loaded.size_bytes / 1024**2, 1),
+                )
+                for loaded in self._models.values()
+            ]
+
+
+def _load_hf_embedding_model(model_name: str) -> LoadedEmbeddingModel:
+    """Load a HuggingFace embedding model from the local embedding models directory."""
     from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 
     cache_dir = Path(defaults["embedding_models_dir"]).absolute()
@@ -77,19 +158,51 @@ def get_hf_embedding_model(model_name: str | None = None):
 
     # Set environment variable for Hugging Face to use our cache directory
     os.environ["TRANSFORMERS_CACHE"] = str(cache_dir)
-    return HuggingFaceEmbedding(
-        model_name=model_name or defaults["hf_embedding_model"],
+    start = time.time()
+    embed_model = HuggingFaceEmbedding(
+        model_name=model_name,
         device="cpu",
         cache_folder=str(cache_dir),
     )
+    loaded_model = LoadedEmbeddingModel(
+        name=model_name,
+        model=embed_model,
+        load_time=time.time() - start,
+        size_bytes=get_model_size_bytes(embed_model),
+    )
+    logger.info(
+        f"Loaded embedding model '{model_name}' in {loaded_model.load_time:.1f}s "
+        f"({loaded_model.size_bytes / 1024**2:.0f} MB)"
+    )
+    return loaded_model
+
+
+embedding_model_registry = EmbeddingModelRegistry(
+    max_memory_mb=defaults["embedding_model_registry_max_memory_mb"]
+)
+
+
+def get_hf_embedding_model(model_name: str | None = None):
+    """Get a HuggingFace embedding model from the process-wide embedding model registry."""
+    return embedding_model_registry.get(model_name or defaults["hf_embedding_model"])
 
 
 def get_embedding_model(llm_provider: str, embedding_model: str):
-    """Get the embedding model based on the LLM provider."""
+    """
+    Get the embedding model based on the LLM provider.
+
+    The embedding model is wrapped with a disk-backed embedding cache when enabled in the configuration.
+    """
     if llm_provider == "openai":
         from llama_index.embeddings.openai import OpenAIEmbedding
 
-        return OpenAIEmbedding(model=embedding_model)
+        embed_model = OpenAIEmbedding(model=embedding_model)
     else:
         # If openai is not used, then fetch a HuggingFace embedding model
-        return get_hf_embedding_model(embedding_model)
+        embed_model = get_hf_embedding_model(embedding_model)
+
+    if defaults["embedding_cache"]:
+        from finmas.crews.embedding_cache import CachedEmbedding
+
+        return CachedEmbedding(embed_model)
+    return embed_model
@@ -1,3 +1,5 @@
+from functools import partial
+
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai_tools import LlamaIndexTool
@@ -5,8 +7,8 @@ from edgar import Filing
 
 from finmas.constants import agent_config, defaults
 from finmas.crews.model_provider import get_crewai_llm_model
-from finmas.crews.utils import SECCrewConfiguration, get_log_filename
-from finmas.data.sec.query_engine import get_sec_query_engine
+from finmas.crews.utils import SECCrewConfiguration, get_log_filename, run_concurrently
+from finmas.data.sec.query_engine import get_filing_segmentation, get_sec_query_engine
 from finmas.data.sec.sec_parser import SECTION_FILENAME_MAP
 
 
@@ -33,25 +35,34 @@ class SECFilingSectionsCrew:
         self.crewai_llm = get_crewai_llm_model(
             llm_provider, llm_model, temperature=temperature, max_tokens=max_tokens
         )
-        for section in SECTION_FILENAME_MAP.keys():
-            query_engine, metrics = get_sec_query_engine(
-                ticker,
-                llm_provider,
-                llm_model,
-                embedding_model,
-                filing=filing,
-                method=f"section:{section}",
-                temperature=temperature,
-                max_tokens=max_tokens,
-                similarity_top_k=similarity_top_k,
-            )
+        # Parse the filing once and build the section indexes concurrently
+        segmentation = get_filing_segmentation(ticker, filing)
+        results = run_concurrently(
+            {
+                section: partial(
+                    get_sec_query_engine,
+                    ticker,
+                    llm_provider,
+                    llm_model,
+                    embedding_model,
+                    filing=filing,
+                    method=f"section:{section}",
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    similarity_top_k=similarity_top_k,
+                    segmentation=segmentation,
+                )
+                for section in SECTION_FILENAME_MAP.keys()
+            }
+        )
+        for section, (query_engine, metrics) in results.items():
             setattr(self, f"{section}_query_engine", query_engine)
             setattr(self, f"{section}_index_creation_metrics", metrics)
             setattr(
                 self,
                 f"{section}_tool",
                 LlamaIndexTool.from_query_engine(
-                    getattr(self, f"{section}_query_engine"),
+                    query_engine,
                     name=f"{filing.form} SEC Filing Query Tool for {ticker}",
                     description=f"Use this tool to search and analyze the the {filing.form} SEC filing",
                 ),
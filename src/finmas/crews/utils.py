@@ -1,6 +1,9 @@
 import datetime as dt
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 import yaml
 from crewai.types.usage_metrics import UsageMetrics
@@ -18,6 +21,9 @@ class IndexCreationMetrics:
     chunk_size: int
     chunk_overlap: int
     total_embedding_token_count: int
+    loaded_from_storage: bool = False
+    embedding_cache_hits: int = 0
+    embedding_cache_misses: int = 0
 
     def markdown(self) -> str:
         output = (
@@ -29,6 +35,14 @@ class IndexCreationMetrics:
             f"- Chunk overlap: {self.chunk_overlap} tokens\n"
             f"- Total embedding token count: {self.total_embedding_token_count}\n"
         )
+        if self.loaded_from_storage:
+            output += "- Index loaded from storage without embedding the text\n"
+        if self.embedding_cache_hits or self.embedding_cache_misses:
+            output += (
+                f"- Embedding cache hits: {self.embedding_cache_hits}, "
+                f"misses: {self.embedding_cache_misses} "
+                f"({self.total_embedding_token_count} tokens embedded)\n"
+            )
         if self.embedding_model in defaults["embedding_model_cost"]:
             cost = (
                 defaults["embedding_model_cost"][self.embedding_model]
@@ -235,3 +249,24 @@ def get_index_creation_metrics(crew) -> str:
             result += f"## {attr.replace('_', ' ').title()}\n\n{getattr(crew, attr).markdown()}\n"
 
     return result
+
+
+def run_concurrently(
+    jobs: dict[str, Callable[[], Any]], max_workers: int | None = None
+) -> dict[str, Any]:
+    """
+    Run independent jobs concurrently in a bounded thread pool.
+
+    Used to create the vector store indexes of a crew in parallel.
+
+    Args:
+        jobs: Mapping from job name to a callable without arguments
+        max_workers: Maximum number of worker threads. Defaults to index_build_max_workers.
+
+    Returns:
+        Mapping from job name to the result of the job.
+    """
+    max_workers = max_workers or defaults["index_build_max_workers"]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {name: executor.submit(job) for name, job in jobs.items()}
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,140 @@
+import datetime as dt
+
+import pandas as pd
+from edgar.entity.filings import EntityFilings
+
+from finmas.constants import defaults
+from finmas.data.market.alpha_vantage import get_fundamental_data
+from finmas.data.market.fundamentals_store import (
+    INDEX_COL,
+    load_fundamentals_dataset,
+    read_fundamentals,
+)
+from finmas.data.market.tiingo import get_price_data
+from finmas.data.sec.filings import get_company_filings
+from finmas.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def get_price_data_as_of(ticker: str, as_of: dt.date | str, years: int = 5) -> pd.DataFrame:
+    """
+    Get the daily prices for a ticker that were known at the end of the as-of date.
+
+    The prices are served from the local price store, so repeated historical runs
+    only fetch the parts of the range that are not stored yet.
+
+    Args:
+        ticker: The stock ticker
+        as_of: The as-of date
+        years: Years of price history before the as-of date
+    """
+    end = pd.Timestamp(as_of).normalize()
+    start = end - pd.DateOffset(years=years)
+    return get_price_data(ticker, start=start.date(), end=end.date())
+
+
+def get_fundamentals_availability(ticker: str, index: pd.DatetimeIndex, freq: str) -> pd.Series:
+    """
+    Returns the date when the fundamental data for each fiscal period was publicly available.
+
+    The reported date of the stored quarterly earnings is used for the fiscal periods where
+    it is known. Only the stored earnings are read, so no request is sent to Alpha Vantage.
+    The remaining fiscal periods are assumed to be available `fundamentals_reporting_lag_days`
+    after the end of the fiscal period, which follows the SEC deadlines for 10-Q and 10-K filings.
+
+    Args:
+        ticker: The stock ticker
+        index: The fiscal dates ending of the fundamental data
+        freq: The frequency of the data. Either "Annual" or "Quarterly"
+    """
+    lag = pd.Timedelta(days=defaults["fundamentals_reporting_lag_days"][freq])
+    availability = pd.Series(index + lag, index=index)
+
+    earnings_df = read_fundamentals(ticker, "earnings", "Quarterly", columns=["reportedDate"])
+    if earnings_df is not None:
+        reported_date = earnings_df["reportedDate"].dropna()
+        reported_date = reported_date[~reported_date.index.duplicated(keep="last")]
+        availability.update(reported_date.reindex(index).dropna())
+    return availability
+
+
+def filter_fundamentals_as_of(
+    df: pd.DataFrame, ticker: str, freq: str, as_of: dt.date | str
+) -> pd.DataFrame:
+    """
+    Remove the fiscal periods of fundamental data that were not publicly available on the as-of date.
+
+    Args:
+        df: Fundamental data with the fiscal date ending as index
+        ticker: The stock ticker
+        freq: The frequency of the data. Either "Annual" or "Quarterly"
+        as_of: The as-of date
+    """
+    if df.empty:
+        return df
+    assert isinstance(df.index, pd.DatetimeIndex)
+    availability = get_fundamentals_availability(ticker, df.index, freq)
+    return df[(availability <= pd.Timestamp(as_of).normalize()).to_numpy()]
+
+
+def filter_fundamentals_panel_as_of(
+    df: pd.DataFrame, freq: str, as_of: dt.date | str
+) -> pd.DataFrame:
+    """
+    Remove the fiscal periods that were not publicly available on the as-of date for many tickers.
+
+    The reported dates are read from the stored quarterly earnings of all the tickers at once.
+
+    Args:
+        df: Fundamental data with a MultiIndex of ticker and fiscal date ending
+        freq: The frequency of the data. Either "Annual" or "Quarterly"
+        as_of: The as-of date
+    """
+    if df.empty:
+        return df
+    lag = pd.Timedelta(days=defaults["fundamentals_reporting_lag_days"][freq])
+    availability = pd.Series(df.index.get_level_values(INDEX_COL) + lag, index=df.index)
+
+    tickers = df.index.get_level_values("ticker").unique().tolist()
+    earnings_df = load_fundamentals_dataset(
+        "earnings", "Quarterly", tickers=tickers, columns=["reportedDate"]
+    )
+    if not earnings_df.empty:
+        reported_date = earnings_df["reportedDate"].dropna()
+        reported_date = reported_date[~reported_date.index.duplicated(keep="last")]
+        availability.update(reported_date.reindex(df.index).dropna())
+    return df[(availability <= pd.Timestamp(as_of).normalize()).to_numpy()]
+
+
+def get_fundamental_data_as_of(
+    ticker: str, type: str, freq: str, as_of: dt.date | str, columns: list[str] | None = None
+) -> pd.DataFrame:
+    """
+    Return the fundamental data for a ticker that was publicly available on the as-of date.
+
+    Args:
+        ticker: The stock ticker
+        type: The type of the data. Either "income", "balance", "cash_flow" or "earnings"
+        freq: The frequency of the data. Either "Annual" or "Quarterly"
+        as_of: The as-of date
+        columns: The columns to return. If None, all columns are returned.
+    """
+    df = get_fundamental_data(ticker, type=type, freq=freq, columns=columns)
+    return filter_fundamentals_as_of(df, ticker, freq=freq, as_of=as_of)
+
+
+def get_sec_filings_as_of(
+    ticker: str, filing_types: list[str], as_of: dt.date | str, latest: int = 10
+) -> EntityFilings:
+    """
+    Get the latest SEC filings of the given types that were filed on or before the as-of date.
+
+    The filings are derived from the cached filing history of the company.
+    """
+    as_of = pd.Timestamp(as_of).date().isoformat()
+    return (
+        get_company_filings(ticker)
+        .filter(form=filing_types, amendments=True, filing_date=f":{as_of}")
+        .latest(latest)
+    )
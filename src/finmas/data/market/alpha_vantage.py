@@ -1,43 +1,92 @@
 import os
-from pathlib import Path
+import re
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 from alpha_vantage.fundamentaldata import FundamentalData
 
 from finmas.constants import defaults
+from finmas.data.market.fundamentals_store import (
+    FUNDAMENTAL_TYPES,
+    conform_fundamentals,
+    get_fundamentals_path,
+    migrate_legacy_fundamentals,
+    read_fundamentals,
+    validate_fundamentals_args,
+    write_fundamentals,
+)
 from finmas.logger import get_logger, log_execution_time
+from finmas.utils.rate_limiter import SlidingWindowRateLimiter
 
 logger = get_logger(__name__)
 
 
-@log_execution_time(logger)
-def get_fundamental_data(ticker: str, type: str, freq: str) -> pd.DataFrame:
+# Shared by all requests to Alpha Vantage in the process
+rate_limiter = SlidingWindowRateLimiter(
+    max_requests=defaults["alpha_vantage_requests_per_minute"], window=60
+)
+
+
+class AlphaVantageRateLimitError(Exception):
+    """Raised when Alpha Vantage rejects a request because a rate limit is reached."""
+
+    def __init__(self, message: str, daily_limit: bool = False) -> None:
+        """
+        Initialize the AlphaVantageRateLimitError class.
+
+        Args:
+            message: The message returned by Alpha Vantage
+            daily_limit: Whether the daily limit is reached, as opposed to the per-minute limit
+        """
+        super().__init__(message)
+        self.daily_limit = daily_limit
+
+
+# Phrases in the Alpha Vantage response when a request is throttled
+RATE_LIMIT_PHRASES = ["rate limit", "call frequency", "requests per", "spreading out"]
+# Sentence in the Alpha Vantage response when the daily limit is reached, e.g.
+# "Our standard API rate limit is 25 requests per day."
+DAILY_LIMIT_PATTERN = re.compile(r"rate limit is \d+ requests per day")
+
+
+def parse_rate_limit_error(message: str) -> AlphaVantageRateLimitError | None:
     """
-    Return fundamental data for a given ticker using Alpha Vantage as data source.
+    Returns a rate limit error if the Alpha Vantage message says that a request is throttled.
 
-    The full historical data is returned.
+    The per-minute and burst messages also mention the daily limit, e.g. "5 calls per minute
+    and 500 calls per day" or "(25 requests per day)", so only the sentence that says that
+    the daily limit is reached is treated as the daily limit.
+    """
+    lower_message = message.lower()
+    if not any(phrase in lower_message for phrase in RATE_LIMIT_PHRASES):
+        return None
+    daily_limit = (
+        DAILY_LIMIT_PATTERN.search(lower_message) is not None
+        and "per minute" not in lower_message
+        and "spreading out" not in lower_message
+    )
+    return AlphaVantageRateLimitError(message, daily_limit=daily_limit)
+
+
+def fetch_fundamental_data(ticker: str, type: str, freq: str) -> pd.DataFrame:
+    """
+    Fetch the full history of fundamental data for a given ticker from Alpha Vantage.
+
+    The data is conformed to the fixed schema of the fundamentals store, but not stored.
+    The request waits for a token from the shared Alpha Vantage rate limiter.
 
     Args:
         ticker: The stock ticker
         type: The type of the data. Either "income", "balance", "cash_flow" or "earnings"
         freq: The frequency of the data. Either "Annual" or "Quarterly"
-    """
-    if type not in ["income", "balance", "cash_flow", "earnings"]:
-        raise ValueError(f"Invalid type '{type}'")
-    if freq not in ["Annual", "Quarterly"]:
-        raise ValueError(f"Invalid frequency '{freq}'")
-
-    fundamentals_dir = Path(defaults["data_dir"]) / "fundamentals" / ticker
-    fundamentals_dir.mkdir(parents=True, exist_ok=True)
-    file_path = fundamentals_dir / f"{type}_{freq.lower()}.csv"
-    if file_path.exists():
-        logger.info(f"Reading {type} data for '{ticker}' from '{str(file_path)}'")
-        return pd.read_csv(file_path, index_col=0, parse_dates=True)
 
-    if os.getenv("ALPHAVANTAGE_API_KEY") is None:
-        logger.error("ALPHAVANTAGE_API_KEY environment variable not set.")
-        return pd.DataFrame()
+    Raises:
+        AlphaVantageRateLimitError: If the request is throttled by Alpha Vantage
+        ValueError: If Alpha Vantage returns an error, e.g. for an unknown ticker
+    """
+    validate_fundamentals_args(type, freq)
     fundamentals = FundamentalData(output_format="pandas")
+    rate_limiter.acquire()
 
     data_func_map = {
         "income": {
@@ -58,31 +107,101 @@ def get_fundamental_data(ticker: str, type: str, freq: str) -> pd.DataFrame:
         },
     }
 
-    data_func = data_func_map.get(type, {}).get(freq)
-    if type not in data_func_map or data_func is None:
-        raise ValueError(f"Invalid type '{type}' or frequency '{freq}'")
-
     try:
-        df: pd.DataFrame = data_func(ticker)[0]
-    except Exception as e:
-        print(e)
+        df: pd.DataFrame = data_func_map[type][freq](ticker)[0]
+    except ValueError as e:
+        rate_limit_error = parse_rate_limit_error(str(e))
+        if rate_limit_error is not None:
+            raise rate_limit_error from e
+        raise
+
+    if df.empty or "fiscalDateEnding" not in df.columns:
         return pd.DataFrame()
 
     df.set_index("fiscalDateEnding", inplace=True)
-    df.index = pd.to_datetime(df.index)
-    df.sort_index(inplace=True)
-    if "reportedCurrency" in df.columns:
-        df.drop(columns=["reportedCurrency"], inplace=True)
+    return conform_fundamentals(df, type)
 
-    df = df.apply(pd.to_numeric, errors="coerce")
 
-    df = df.dropna(axis=1, how="all")
+@log_execution_time(logger)
+def get_fundamental_data(
+    ticker: str, type: str, freq: str, columns: list[str] | None = None
+) -> pd.DataFrame:
+    """
+    Return fundamental data for a given ticker using Alpha Vantage as data source.
+
+    The full historical data is returned with the fixed schema of the fundamentals store.
+    Data that is stored is read from the store, and legacy CSV files are migrated to the store.
+
+    Args:
+        ticker: The stock ticker
+        type: The type of the data. Either "income", "balance", "cash_flow" or "earnings"
+        freq: The frequency of the data. Either "Annual" or "Quarterly"
+        columns: The columns to return. If None, all columns are returned.
+    """
+    validate_fundamentals_args(type, freq)
+
+    df = read_fundamentals(ticker, type, freq, columns=columns)
+    if df is None and migrate_legacy_fundamentals(ticker, type, freq):
+        df = read_fundamentals(ticker, type, freq, columns=columns)
+    if df is not None:
+        file_path = get_fundamentals_path(ticker, type, freq)
+        logger.info(f"Reading {type} data for '{ticker}' from '{str(file_path)}'")
+        return df
+
+    if os.getenv("ALPHAVANTAGE_API_KEY") is None:
+        logger.error("ALPHAVANTAGE_API_KEY environment variable not set.")
+        return pd.DataFrame()
+
+    try:
+        df = fetch_fundamental_data(ticker, type, freq)
+    except Exception as e:
+        logger.error(f"Could not fetch {type} data for '{ticker}': {e}")
+        return pd.DataFrame()
+    if df.empty:
+        return df
 
     if defaults["save_fundamental_data"]:
-        df.to_csv(file_path)
+        file_path = write_fundamentals(ticker, type, freq, df)
         logger.info(f"{type.title()} data for '{ticker}' stored in '{str(file_path)}'")
 
-    return df
+    return df[columns] if columns is not None else df
+
+
+def get_fundamentals_frame(
+    ticker: str,
+    types: list[str] | None = None,
+    freq: str = "Quarterly",
+    columns: dict[str, list[str]] | None = None,
+) -> pd.DataFrame:
+    """
+    Return several types of fundamental data for a ticker as one frame aligned on the fiscal dates.
+
+    The types that are not stored are fetched concurrently from Alpha Vantage,
+    within the budget of the shared rate limiter.
+
+    Args:
+        ticker: The stock ticker
+        types: The types of the data. Defaults to all types.
+        freq: The frequency of the data. Either "Annual" or "Quarterly"
+        columns: The columns to read for each type. All columns are read for the other types.
+
+    Returns:
+        DataFrame with the fiscal dates ending as index and the type and line item as columns.
+        Types without data are left out.
+    """
+    types = types or FUNDAMENTAL_TYPES
+    columns = columns or {}
+    with ThreadPoolExecutor(max_workers=len(types)) as executor:
+        futures = {
+            type: executor.submit(get_fundamental_data, ticker, type, freq, columns.get(type))
+            for type in types
+        }
+        frames = {type: future.result() for type, future in futures.items()}
+
+    frames = {type: df for type, df in frames.items() if not df.empty}
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1, names=["type", None]).sort_index()
 
 
 def get_income_statement_df(ticker: str, freq: str, cols: list[str] | None = None) -> pd.DataFrame:
@@ -90,18 +209,20 @@ def get_income_statement_df(ticker: str, freq: str, cols: list[str] | None = Non
     Return the income statements as a DataFrame for a given ticker.
 
     The DataFrame is wrangled and adds the net profit margin as a new column.
+    Only the given columns and the columns needed for the net profit margin are read.
 
     Args:
         ticker: The stock ticker
         freq: The frequency of the data. Either "Annual" or "Quarterly"
         cols: The columns to return. If None, all columns are returned
     """
-    df = get_fundamental_data(ticker=ticker, type="income", freq=freq)
+    read_cols = list(dict.fromkeys([*cols, "netIncome", "totalRevenue"])) if cols else None
+    df = get_fundamental_data(ticker=ticker, type="income", freq=freq, columns=read_cols)
 
     if not isinstance(df, pd.DataFrame) or df.empty:
         return pd.DataFrame()
-    if cols:
-        df = df[cols]
 
     df["netProfitMargin"] = df["netIncome"] / df["totalRevenue"]
+    if cols:
+        df = df[[*cols, "netProfitMargin"]]
     return df
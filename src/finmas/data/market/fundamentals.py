@@ -1,11 +1,17 @@
+import datetime as dt
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 from crewai.tools import BaseTool
-from dateutil.relativedelta import relativedelta
 from pydantic import BaseModel, Field
 
 from finmas.constants import defaults
-from finmas.data.market.alpha_vantage import get_fundamental_data, get_income_statement_df
-from finmas.data.market.tiingo import get_price_data
+from finmas.data.as_of import filter_fundamentals_as_of, get_price_data_as_of
+from finmas.data.market.alpha_vantage import get_fundamentals_frame
+from finmas.data.market.fundamentals_store import get_fundamentals_path
+from finmas.data.market.price_store import load_price_coverage
 from finmas.logger import get_logger
 from finmas.utils.common import extract_cols_from_df, get_text_content_file
 
@@ -45,6 +51,19 @@ YOY_COLS_MAP = {
 
 NUM_QUARTERS = defaults["fundamental_analysis_quarters"]
 
+# Number of computed ticker essentials kept in memory
+TICKER_ESSENTIALS_CACHE_SIZE = 128
+
+_essentials_cache: OrderedDict[tuple, pd.DataFrame] = OrderedDict()
+_essentials_cache_lock = threading.Lock()
+
+ESSENTIAL_INCOME_COLS = ["totalRevenue", "grossProfit", "operatingExpenses", "netIncome"]
+ESSENTIAL_BALANCE_COLS = [
+    "commonStockSharesOutstanding",
+    "totalLiabilities",
+    "totalShareholderEquity",
+]
+
 
 def format_value(value):
     """
@@ -69,12 +88,16 @@ class StockFundamentalsTool(BaseTool):
     name: str = "Stock Fundamentals Tool"
     description: str = "Use this tool to get essential fundamental data for a given stock ticker."
     args_schema: type[BaseModel] = StockFundamentalsInput
+    as_of: dt.date | None = None
+
+    def __init__(self, as_of: dt.date | None = None, **kwargs):
+        super().__init__(as_of=as_of, **kwargs)
 
     def _run(self, ticker: str) -> str:
         """Function that returns essential fundamental data for a given ticker in a Markdown table format."""
         include_qoq = defaults["fundamentals_tool"]["include_qoq"]
 
-        df: pd.DataFrame = get_ticker_essentials(ticker)
+        df: pd.DataFrame = get_ticker_essentials(ticker, as_of=self.as_of)
         if df.empty:
             return f"No data found for {ticker}."
 
@@ -137,75 +160,153 @@ class StockFundamentalsTool(BaseTool):
         return table_output
 
 
-def get_ticker_essentials(ticker: str) -> pd.DataFrame:
+def _grouped_rolling_sum(series: pd.Series, window: int = 4) -> pd.Series:
+    """Rolling sum of the series computed separately for each ticker."""
+    return series.groupby(level="ticker", sort=False).rolling(window).sum().droplevel(0)
+
+
+def _grouped_pct_change(series: pd.Series, periods: int = 1) -> pd.Series:
+    """Percentage change of the series computed separately for each ticker."""
+    return series.groupby(level="ticker", sort=False).pct_change(periods)
+
+
+def compute_essential_metrics(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Gets essential data for a given ticker.
+    Compute essential metrics from the income statement, balance sheet and price data.
 
-    Price data is fetched from Tiingo and fundamental data is fetched from Alpha Vantage.
-    Income statement and Balance sheet data are used to calculate additional metrics.
+    The metrics are computed for all tickers at once, grouped by the ticker level of the index.
 
     Args:
-        ticker: The stock ticker
+        df: DataFrame with a MultiIndex of ticker and fiscal date ending, sorted by ticker
+            and date, with the ESSENTIAL_INCOME_COLS, ESSENTIAL_BALANCE_COLS and close columns.
 
     Returns:
         DataFrame with metrics such as EPS, P/E, P/S, D/E, growth rates.
         Twelve months trailing columns are included.
     """
-    # Price data
-    start = (pd.Timestamp.utcnow() - relativedelta(years=5)).date().isoformat()
-    end = pd.Timestamp.utcnow().date().isoformat()
-    price_df = get_price_data(ticker, start=start, end=end)
-
-    # Income statement
-    income_df = get_income_statement_df(ticker, "Quarterly")
-    if income_df.empty:
-        return pd.DataFrame()
-
-    income_df.sort_index(inplace=True)
-    df = income_df[
-        ["totalRevenue", "grossProfit", "operatingExpenses", "netIncome", "netProfitMargin"]
-    ].copy()
-
-    df["close"] = price_df.reindex(df.index, method="ffill")["close"]
-
-    # Balance sheet
-    balance_df = get_fundamental_data(ticker, type="balance", freq="Quarterly")
-    balance_df.sort_index(inplace=True)
+    shares = df["commonStockSharesOutstanding"]
+    balance_df = df[ESSENTIAL_BALANCE_COLS]
+    df = df[[*ESSENTIAL_INCOME_COLS, "close"]].copy()
+    df.insert(4, "netProfitMargin", df["netIncome"] / df["totalRevenue"])
 
-    income_df = income_df.reindex(balance_df.index, method="ffill")
-
-    df["basic_eps"] = income_df["netIncome"] / balance_df["commonStockSharesOutstanding"]
+    df["basic_eps"] = df["netIncome"] / shares
 
     # Trailing 12 months
-    df["totalRevenue_ttm"] = df["totalRevenue"].rolling(4).sum()
-    df["netIncome_ttm"] = df["netIncome"].rolling(4).sum()
+    df["totalRevenue_ttm"] = _grouped_rolling_sum(df["totalRevenue"])
+    df["netIncome_ttm"] = _grouped_rolling_sum(df["netIncome"])
     df["netProfitMargin_ttm"] = df["netIncome_ttm"] / df["totalRevenue_ttm"]
-    df["basic_eps_ttm"] = df["basic_eps"].rolling(4).sum()
+    df["basic_eps_ttm"] = _grouped_rolling_sum(df["basic_eps"])
     df["basic_P/E_ttm"] = df["close"] / df["basic_eps_ttm"]
-    df["P/S_ttm"] = df["close"] / (
-        df["totalRevenue_ttm"] / balance_df["commonStockSharesOutstanding"]
-    )
+    df["P/S_ttm"] = df["close"] / (df["totalRevenue_ttm"] / shares)
 
     # Debt to Equity
     df["D/E"] = balance_df["totalLiabilities"] / balance_df["totalShareholderEquity"]
 
     # Year over year growth for Trailing 12 months
-    df["totalRevenue_ttm_yoy"] = df["totalRevenue_ttm"].pct_change(4) * 100
-    df["netIncome_ttm_yoy"] = df["netIncome_ttm"].pct_change(4) * 100
-    df["netProfitMargin_ttm_yoy"] = df["netProfitMargin_ttm"].pct_change(4) * 100
-    df["basic_eps_ttm_yoy"] = df["basic_eps_ttm"].pct_change(4) * 100
+    for col in ["totalRevenue_ttm", "netIncome_ttm", "netProfitMargin_ttm", "basic_eps_ttm"]:
+        df[f"{col}_yoy"] = _grouped_pct_change(df[col], 4) * 100
 
     # Quarter over quarter growth
-    df["totalRevenue_qoq"] = df["totalRevenue"].pct_change() * 100
-    df["totalRevenue_ttm_qoq"] = df["totalRevenue_ttm"].pct_change() * 100
-    df["netIncome_qoq"] = df["netIncome"].pct_change() * 100
-    df["netIncome_ttm_qoq"] = df["netIncome_ttm"].pct_change() * 100
-    df["netProfitMargin_qoq"] = df["netProfitMargin"].pct_change() * 100
-    df["netProfitMargin_ttm_qoq"] = df["netProfitMargin_ttm"].pct_change() * 100
-    df["basic_eps_qoq"] = df["basic_eps"].pct_change() * 100
+    for col in [
+        "totalRevenue",
+        "totalRevenue_ttm",
+        "netIncome",
+        "netIncome_ttm",
+        "netProfitMargin",
+        "netProfitMargin_ttm",
+        "basic_eps",
+    ]:
+        df[f"{col}_qoq"] = _grouped_pct_change(df[col]) * 100
 
     # Adjust netProfitMargin
     df["netProfitMargin"] *= 100
     df["netProfitMargin_ttm"] *= 100
 
     return df
+
+
+def get_ticker_essentials_inputs_version(ticker: str) -> tuple:
+    """
+    Returns the version of the stored data that the essentials of a ticker are computed from.
+
+    The version consists of the modification times of the stored quarterly income statements,
+    balance sheets and earnings, and the date range covered by the price store.
+    """
+    mtimes = []
+    for type in ["income", "balance", "earnings"]:
+        file_path = get_fundamentals_path(ticker, type, "Quarterly")
+        mtimes.append(file_path.stat().st_mtime_ns if file_path.exists() else None)
+    coverage = load_price_coverage(ticker)
+    price_range = (coverage["start"], coverage["end"]) if coverage else None
+    return (*mtimes, price_range)
+
+
+def get_ticker_essentials(ticker: str, as_of: dt.date | str | None = None) -> pd.DataFrame:
+    """
+    Gets essential data for a given ticker.
+
+    Price data is fetched from Tiingo and fundamental data is fetched from Alpha Vantage.
+    Income statement and Balance sheet data are used to calculate additional metrics.
+    When an as-of date is given, only the prices and the fiscal quarters that were
+    publicly available on that date are used.
+
+    The computed data is cached in memory by ticker, as-of date, end date of the prices and
+    the version of the stored input data, so the cache is invalidated when new fundamental data
+    or prices are stored, and when the day changes for unrestricted data.
+    A copy of the cached DataFrame is returned.
+
+    Args:
+        ticker: The stock ticker
+        as_of: The as-of date. If None, the data is not restricted and prices up to today are used.
+
+    Returns:
+        DataFrame with metrics such as EPS, P/E, P/S, D/E, growth rates.
+        Twelve months trailing columns are included.
+    """
+    as_of_date: dt.date | None = pd.Timestamp(as_of).date() if as_of is not None else None
+    price_end = as_of_date or pd.Timestamp.utcnow().date()
+
+    key = (ticker, as_of_date, price_end, get_ticker_essentials_inputs_version(ticker))
+    with _essentials_cache_lock:
+        if key in _essentials_cache:
+            _essentials_cache.move_to_end(key)
+            return _essentials_cache[key].copy()
+
+    df = _compute_ticker_essentials(ticker, as_of_date, price_end)
+
+    # The inputs may have been fetched and stored while computing the essentials
+    key = (ticker, as_of_date, price_end, get_ticker_essentials_inputs_version(ticker))
+    with _essentials_cache_lock:
+        _essentials_cache[key] = df
+        while len(_essentials_cache) > TICKER_ESSENTIALS_CACHE_SIZE:
+            _essentials_cache.popitem(last=False)
+    return df.copy()
+
+
+def _compute_ticker_essentials(
+    ticker: str, as_of: dt.date | None, price_end: dt.date
+) -> pd.DataFrame:
+    # The prices and the fundamental statements are fetched concurrently for a new ticker
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        price_future = executor.submit(get_price_data_as_of, ticker, as_of=price_end, years=5)
+        fundamentals_df = get_fundamentals_frame(
+            ticker,
+            types=["income", "balance"],
+            freq="Quarterly",
+            columns={"income": ESSENTIAL_INCOME_COLS, "balance": ESSENTIAL_BALANCE_COLS},
+        )
+        price_df = price_future.result()
+
+    types = fundamentals_df.columns.get_level_values("type") if not fundamentals_df.empty else []
+    if "income" not in types or "balance" not in types:
+        return pd.DataFrame()
+
+    df = fundamentals_df["income"].dropna(how="all").join(fundamentals_df["balance"])
+    if as_of is not None:
+        df = filter_fundamentals_as_of(df, ticker, freq="Quarterly", as_of=as_of)
+    if df.empty:
+        return pd.DataFrame()
+    df["close"] = price_df.reindex(df.index, method="ffill")["close"]
+
+    df = compute_essential_metrics(pd.concat({ticker: df}, names=["ticker"]))
+    return df.droplevel("ticker")
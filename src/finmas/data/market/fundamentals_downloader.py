@@ -0,0 +1,197 @@
+import datetime as dt
+from collections import Counter
+from dataclasses import dataclass
+
+import pandas as pd
+
+from finmas.cache_config import cache, fundamentals_queue
+from finmas.constants import defaults
+from finmas.data.market.alpha_vantage import (
+    AlphaVantageRateLimitError,
+    fetch_fundamental_data,
+    rate_limiter,
+)
+from finmas.data.market.fundamentals_store import (
+    FUNDAMENTAL_TYPES,
+    get_fundamentals_path,
+    validate_fundamentals_args,
+    write_fundamentals,
+)
+from finmas.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Backoff in seconds after a throttled request, doubled for each consecutive throttled request
+THROTTLE_BACKOFF_SECONDS = 60
+MAX_THROTTLE_BACKOFF_SECONDS = 15 * 60
+
+
+@dataclass
+class FundamentalsJob:
+    """A download job for one type and frequency of fundamental data for a ticker."""
+
+    ticker: str
+    type: str
+    freq: str
+    attempts: int = 0
+    error: str | None = None
+
+    @property
+    def key(self) -> str:
+        """Key of the job in the queue."""
+        return f"{self.ticker}:{self.type}:{self.freq}"
+
+
+def get_request_count_key(date: dt.date) -> str:
+    """Returns the cache key for the number of Alpha Vantage requests sent on the given date."""
+    return f"alpha_vantage_requests:{date.isoformat()}"
+
+
+def get_request_count(date: dt.date) -> int:
+    """Returns the number of Alpha Vantage requests sent by the downloader on the given date."""
+    return cache.get(get_request_count_key(date), default=0)
+
+
+def enqueue_fundamentals_jobs(
+    tickers: list[str],
+    types: list[str] | None = None,
+    freqs: list[str] | None = None,
+    force: bool = False,
+) -> int:
+    """
+    Add download jobs for the fundamental data of the tickers to the persistent queue.
+
+    Fundamental data that is already stored is skipped unless force is True.
+    Jobs that are already in the queue are kept with their attempts.
+
+    Args:
+        tickers: The stock tickers
+        types: The types of the data. Defaults to all types.
+        freqs: The frequencies of the data. Defaults to Quarterly.
+        force: Download the data even when it is already stored
+
+    Returns:
+        The number of jobs added to the queue.
+    """
+    types = types or FUNDAMENTAL_TYPES
+    freqs = freqs or ["Quarterly"]
+    num_added = 0
+    for ticker in tickers:
+        for type in types:
+            for freq in freqs:
+                validate_fundamentals_args(type, freq)
+                job = FundamentalsJob(ticker=ticker, type=type, freq=freq)
+                if job.key in fundamentals_queue:
+                    continue
+                if not force and get_fundamentals_path(ticker, type, freq).exists():
+                    continue
+                fundamentals_queue[job.key] = job
+                num_added += 1
+    return num_added
+
+
+def reset_failed_fundamentals_jobs() -> int:
+    """Reset the attempts of the failed jobs in the queue so that they are retried."""
+    max_attempts = defaults["fundamentals_download_max_attempts"]
+    num_reset = 0
+    for key, job in list(fundamentals_queue.items()):
+        if job.attempts >= max_attempts:
+            fundamentals_queue[key] = FundamentalsJob(job.ticker, job.type, job.freq)
+            num_reset += 1
+    return num_reset
+
+
+def get_fundamentals_queue_df() -> pd.DataFrame:
+    """Returns the jobs in the fundamentals download queue as a DataFrame."""
+    max_attempts = defaults["fundamentals_download_max_attempts"]
+    records = [
+        dict(
+            ticker=job.ticker,
+            type=job.type,
+            freq=job.freq,
+            status="failed" if job.attempts >= max_attempts else "pending",
+            attempts=job.attempts,
+            error=job.error,
+        )
+        for job in fundamentals_queue.values()
+    ]
+    return pd.DataFrame(records, columns=["ticker", "type", "freq", "status", "attempts", "error"])
+
+
+def run_fundamentals_queue(requests_per_day: int | None = None) -> dict[str, int]:
+    """
+    Download the fundamental data for the jobs in the persistent queue.
+
+    Requests are paced by the shared Alpha Vantage rate limiter, and the run stops when
+    the daily limit is reached, which is counted across runs. Throttled requests pause the
+    token bucket with exponential backoff and are retried. Jobs that fail are retried until
+    `fundamentals_download_max_attempts` is reached and are then left in the queue as failed.
+    Completed jobs are removed from the queue, so that an interrupted run can be resumed.
+
+    Args:
+        requests_per_day: Alpha Vantage requests per day.
+            Defaults to `alpha_vantage_requests_per_day`.
+
+    Returns:
+        Number of jobs that were downloaded, had no data, failed or are still pending.
+    """
+    requests_per_day = requests_per_day or defaults["alpha_vantage_requests_per_day"]
+    max_attempts = defaults["fundamentals_download_max_attempts"]
+
+    backoff = THROTTLE_BACKOFF_SECONDS
+    counts: Counter[str] = Counter()
+    daily_limit_reached = False
+
+    while not daily_limit_reached:
+        jobs = [job for job in fundamentals_queue.values() if job.attempts < max_attempts]
+        if not jobs:
+            break
+
+        for job in jobs:
+            today = dt.date.today()
+            if get_request_count(today) >= requests_per_day:
+                logger.warning(f"Daily limit of {requests_per_day} requests reached")
+                daily_limit_reached = True
+                break
+
+            cache.set(
+                get_request_count_key(today),
+                get_request_count(today) + 1,
+                expire=dt.timedelta(days=2).total_seconds(),
+            )
+            try:
+                df = fetch_fundamental_data(job.ticker, job.type, job.freq)
+            except AlphaVantageRateLimitError as e:
+                if e.daily_limit or backoff > MAX_THROTTLE_BACKOFF_SECONDS:
+                    logger.warning(f"Alpha Vantage rate limit reached: {e}")
+                    cache.set(
+                        get_request_count_key(today),
+                        requests_per_day,
+                        expire=dt.timedelta(days=2).total_seconds(),
+                    )
+                    daily_limit_reached = True
+                    break
+                logger.warning(f"Request throttled by Alpha Vantage. Backing off {backoff}s")
+                rate_limiter.pause(backoff)
+                backoff *= 2
+                continue
+            except Exception as e:
+                logger.error(f"Could not download {job.type} data for '{job.ticker}': {e}")
+                job.attempts += 1
+                job.error = str(e)
+                fundamentals_queue[job.key] = job
+                continue
+
+            backoff = THROTTLE_BACKOFF_SECONDS
+            if df.empty:
+                logger.warning(f"No {job.type} data found for '{job.ticker}'")
+                counts["empty"] += 1
+            else:
+                file_path = write_fundamentals(job.ticker, job.type, job.freq, df)
+                logger.info(f"{job.type.title()} data for '{job.ticker}' stored in '{file_path}'")
+                counts["downloaded"] += 1
+            del fundamentals_queue[job.key]
+
+    for job in fundamentals_queue.values():
+        counts["failed" if job.attempts >= max_attempts else "pending"] += 1
+    return {status: counts[status] for status in ["downloaded", "empty", "failed", "pending"]}
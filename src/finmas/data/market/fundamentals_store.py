@@ -0,0 +1,294 @@
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from finmas.constants import defaults
+from finmas.logger import get_logger
+
+logger = get_logger(__name__)
+
+FUNDAMENTAL_TYPES = ["income", "balance", "cash_flow", "earnings"]
+FUNDAMENTAL_FREQS = ["Annual", "Quarterly"]
+
+INDEX_COL = "fiscalDateEnding"
+
+# Line items reported by Alpha Vantage for each type of fundamental data
+FUNDAMENTALS_COLS = {
+    "income": [
+        "grossProfit",
+        "totalRevenue",
+        "costOfRevenue",
+        "costofGoodsAndServicesSold",
+        "operatingIncome",
+        "sellingGeneralAndAdministrative",
+        "researchAndDevelopment",
+        "operatingExpenses",
+        "investmentIncomeNet",
+        "netInterestIncome",
+        "interestIncome",
+        "interestExpense",
+        "nonInterestIncome",
+        "otherNonOperatingIncome",
+        "depreciation",
+        "depreciationAndAmortization",
+        "incomeBeforeTax",
+        "incomeTaxExpense",
+        "interestAndDebtExpense",
+        "netIncomeFromContinuingOperations",
+        "comprehensiveIncomeNetOfTax",
+        "ebit",
+        "ebitda",
+        "netIncome",
+    ],
+    "balance": [
+        "totalAssets",
+        "totalCurrentAssets",
+        "cashAndCashEquivalentsAtCarryingValue",
+        "cashAndShortTermInvestments",
+        "inventory",
+        "currentNetReceivables",
+        "totalNonCurrentAssets",
+        "propertyPlantEquipment",
+        "accumulatedDepreciationAmortizationPPE",
+        "intangibleAssets",
+        "intangibleAssetsExcludingGoodwill",
+        "goodwill",
+        "investments",
+        "longTermInvestments",
+        "shortTermInvestments",
+        "otherCurrentAssets",
+        "otherNonCurrentAssets",
+        "totalLiabilities",
+        "totalCurrentLiabilities",
+        "currentAccountsPayable",
+        "deferredRevenue",
+        "currentDebt",
+        "shortTermDebt",
+        "totalNonCurrentLiabilities",
+        "capitalLeaseObligations",
+        "longTermDebt",
+        "currentLongTermDebt",
+        "longTermDebtNoncurrent",
+        "shortLongTermDebtTotal",
+        "otherCurrentLiabilities",
+        "otherNonCurrentLiabilities",
+        "totalShareholderEquity",
+        "treasuryStock",
+        "retainedEarnings",
+        "commonStock",
+        "commonStockSharesOutstanding",
+    ],
+    "cash_flow": [
+        "operatingCashflow",
+        "paymentsForOperatingActivities",
+        "proceedsFromOperatingActivities",
+        "changeInOperatingLiabilities",
+        "changeInOperatingAssets",
+        "depreciationDepletionAndAmortization",
+        "capitalExpenditures",
+        "changeInReceivables",
+        "changeInInventory",
+        "profitLoss",
+        "cashflowFromInvestment",
+        "cashflowFromFinancing",
+        "proceedsFromRepaymentsOfShortTermDebt",
+        "paymentsForRepurchaseOfCommonStock",
+        "paymentsForRepurchaseOfEquity",
+        "paymentsForRepurchaseOfPreferredStock",
+        "dividendPayout",
+        "dividendPayoutCommonStock",
+        "dividendPayoutPreferredStock",
+        "proceedsFromIssuanceOfCommonStock",
+        "proceedsFromIssuanceOfLongTermDebtAndCapitalSecuritiesNet",
+        "proceedsFromIssuanceOfPreferredStock",
+        "proceedsFromRepurchaseOfEquity",
+        "proceedsFromSaleOfTreasuryStock",
+        "changeInCashAndCashEquivalents",
+        "changeInExchangeRate",
+        "netIncome",
+    ],
+    "earnings": [
+        "reportedDate",
+        "reportedEPS",
+        "estimatedEPS",
+        "surprise",
+        "surprisePercentage",
+    ],
+}
+
+# Columns that are stored as dates instead of numbers
+DATE_COLS = [INDEX_COL, "reportedDate"]
+
+
+def get_fundamentals_schema(type: str) -> pa.Schema:
+    """Returns the fixed schema of the stored fundamental data of the given type."""
+    return pa.schema(
+        [
+            pa.field(col, pa.timestamp("ns") if col in DATE_COLS else pa.float64())
+            for col in [INDEX_COL, *FUNDAMENTALS_COLS[type]]
+        ]
+    )
+
+
+def validate_fundamentals_args(type: str, freq: str) -> None:
+    """Raise a ValueError if the type or frequency of fundamental data is invalid."""
+    if type not in FUNDAMENTAL_TYPES:
+        raise ValueError(f"Invalid type '{type}'")
+    if freq not in FUNDAMENTAL_FREQS:
+        raise ValueError(f"Invalid frequency '{freq}'")
+
+
+def get_fundamentals_dataset_dir(type: str, freq: str) -> Path:
+    """Returns the directory of the Parquet dataset with the given type and frequency."""
+    return Path(defaults["fundamentals_dir"]) / f"type={type}" / f"freq={freq}"
+
+
+def get_fundamentals_path(ticker: str, type: str, freq: str) -> Path:
+    """Returns the path of the Parquet file with the stored fundamental data for the ticker."""
+    return get_fundamentals_dataset_dir(type, freq) / f"ticker={ticker}" / "data.parquet"
+
+
+def get_legacy_fundamentals_path(ticker: str, type: str, freq: str) -> Path:
+    """Returns the path of the CSV file used to store fundamental data before the Parquet store."""
+    return Path(defaults["data_dir"]) / "fundamentals" / ticker / f"{type}_{freq.lower()}.csv"
+
+
+def conform_fundamentals(df: pd.DataFrame, type: str) -> pd.DataFrame:
+    """
+    Conform fundamental data to the fixed schema of the given type.
+
+    Missing line items are added as NaN, unknown line items are dropped and
+    the values are converted to numbers or dates.
+
+    Args:
+        df: Fundamental data with the fiscal date ending as index
+        type: The type of the data. Either "income", "balance", "cash_flow" or "earnings"
+    """
+    cols = FUNDAMENTALS_COLS[type]
+    unknown_cols = df.columns.difference(cols)
+    if len(unknown_cols) > 0:
+        logger.debug(f"Dropping unknown {type} columns: {list(unknown_cols)}")
+
+    df = df.reindex(columns=cols)
+    for col in cols:
+        if col in DATE_COLS:
+            df[col] = pd.to_datetime(df[col], errors="coerce").astype("datetime64[ns]")
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+
+    df.index = pd.to_datetime(df.index).astype("datetime64[ns]")
+    df.index.name = INDEX_COL
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+def read_fundamentals(
+    ticker: str, type: str, freq: str, columns: list[str] | None = None
+) -> pd.DataFrame | None:
+    """
+    Read the stored fundamental data for the ticker, optionally limited to some columns.
+
+    Only the requested columns are read from the Parquet file.
+    Returns None if no data is stored for the ticker.
+
+    Args:
+        ticker: The stock ticker
+        type: The type of the data. Either "income", "balance", "cash_flow" or "earnings"
+        freq: The frequency of the data. Either "Annual" or "Quarterly"
+        columns: The columns to read. If None, all columns are read.
+    """
+    import pyarrow.parquet as pq
+
+    file_path = get_fundamentals_path(ticker, type, freq)
+    if not file_path.exists():
+        return None
+
+    read_cols = [INDEX_COL, *columns] if columns is not None else None
+    df = pq.read_table(file_path, columns=read_cols).to_pandas()
+    return df.set_index(INDEX_COL)
+
+
+def write_fundamentals(ticker: str, type: str, freq: str, df: pd.DataFrame) -> Path:
+    """
+    Write the fundamental data for the ticker to the fundamentals store with the fixed schema.
+
+    The file is written to a temporary file first and then renamed, so that an interrupted
+    write never leaves a partially written file behind.
+
+    Returns:
+        The path of the stored Parquet file.
+    """
+    import pyarrow.parquet as pq
+
+    file_path = get_fundamentals_path(ticker, type, freq)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    df = conform_fundamentals(df, type)
+    table = pa.Table.from_pandas(df.reset_index(), schema=get_fundamentals_schema(type))
+    tmp_path = file_path.with_suffix(".parquet.tmp")
+    pq.write_table(table, tmp_path)
+    tmp_path.replace(file_path)
+    return file_path
+
+
+def migrate_legacy_fundamentals(ticker: str, type: str, freq: str) -> bool:
+    """
+    Convert the legacy CSV file with fundamental data for the ticker to the Parquet store.
+
+    The CSV file is kept. Returns True if a CSV file was converted.
+    """
+    csv_path = get_legacy_fundamentals_path(ticker, type, freq)
+    if not csv_path.exists():
+        return False
+
+    df = pd.read_csv(csv_path, index_col=0)
+    file_path = write_fundamentals(ticker, type, freq, df)
+    logger.info(f"Migrated {type} data for '{ticker}' from '{csv_path}' to '{file_path}'")
+    return True
+
+
+def migrate_all_legacy_fundamentals() -> int:
+    """
+    Convert all the legacy CSV files with fundamental data to the Parquet store.
+
+    Returns:
+        The number of converted CSV files.
+    """
+    legacy_dir = Path(defaults["data_dir"]) / "fundamentals"
+    if not legacy_dir.exists():
+        return 0
+
+    num_migrated = 0
+    for ticker_dir in sorted(legacy_dir.iterdir()):
+        if not ticker_dir.is_dir() or "=" in ticker_dir.name:
+            continue
+        for type in FUNDAMENTAL_TYPES:
+            for freq in FUNDAMENTAL_FREQS:
+                num_migrated += migrate_legacy_fundamentals(ticker_dir.name, type, freq)
+    return num_migrated
+
+
+def load_fundamentals_dataset(
+    type: str, freq: str, tickers: list[str] | None = None, columns: list[str] | None = None
+) -> pd.DataFrame:
+    """
+    Load fundamental data for many tickers from the Parquet dataset.
+
+    Only the requested columns and the partitions of the requested tickers are read.
+
+    Returns:
+        DataFrame with a MultiIndex of ticker and fiscal date ending.
+    """
+    import pyarrow.dataset as ds
+
+    dataset_dir = get_fundamentals_dataset_dir(type, freq)
+    if not dataset_dir.exists():
+        return pd.DataFrame()
+
+    partitioning = ds.partitioning(pa.schema([pa.field("ticker", pa.string())]), flavor="hive")
+    schema = get_fundamentals_schema(type).append(pa.field("ticker", pa.string()))
+    dataset = ds.dataset(dataset_dir, schema=schema, format="parquet", partitioning=partitioning)
+    read_cols = ["ticker", INDEX_COL, *(columns or FUNDAMENTALS_COLS[type])]
+    filter = ds.field("ticker").isin(tickers) if tickers is not None else None
+    df = dataset.to_table(columns=read_cols, filter=filter).to_pandas()
+    return df.set_index(["ticker", INDEX_COL]).sort_index()
@@ -0,0 +1,192 @@
+import datetime as dt
+import json
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from finmas.constants import defaults
+from finmas.logger import get_logger
+
+logger = get_logger(__name__)
+
+_ticker_locks: defaultdict[str, threading.Lock] = defaultdict(threading.Lock)
+_ticker_locks_lock = threading.Lock()
+
+
+def get_ticker_lock(ticker: str) -> threading.Lock:
+    """Returns the lock that serializes updates of the price store for the given ticker."""
+    with _ticker_locks_lock:
+        return _ticker_locks[ticker]
+
+
+def get_price_store_path(ticker: str) -> Path:
+    """Returns the path of the Parquet file with the stored daily prices for the ticker."""
+    return Path(defaults["price_store_dir"]) / f"{ticker}.parquet"
+
+
+def get_price_coverage_path(ticker: str) -> Path:
+    """Returns the path of the JSON file with the date range covered by the price store."""
+    return get_price_store_path(ticker).with_suffix(".json")
+
+
+def load_price_coverage(ticker: str) -> dict | None:
+    """
+    Load the metadata of the price store for the ticker.
+
+    The coverage is the date range that has been requested from the data provider,
+    which is wider than the range of the stored bars because of weekends and holidays.
+    The provisional end is the last date fetched before the market closed, which is
+    only covered for `price_today_ttl_minutes` after the prices were stored.
+    Returns None if no prices are stored for the ticker.
+    """
+    coverage_path = get_price_coverage_path(ticker)
+    if not coverage_path.exists() or not get_price_store_path(ticker).exists():
+        return None
+    coverage = json.loads(coverage_path.read_text(encoding="utf-8"))
+    coverage["start"] = pd.Timestamp(coverage["start"])
+    coverage["end"] = pd.Timestamp(coverage["end"])
+    if coverage.get("provisional_end") is not None:
+        coverage["provisional_end"] = pd.Timestamp(coverage["provisional_end"])
+    return coverage
+
+
+def get_covered_end(coverage: dict) -> pd.Timestamp:
+    """Returns the end of the covered range, including a provisional end that is still fresh."""
+    provisional_end = coverage.get("provisional_end")
+    if provisional_end is None or provisional_end <= coverage["end"]:
+        return coverage["end"]
+    ttl = pd.Timedelta(minutes=defaults["price_today_ttl_minutes"])
+    if pd.Timestamp.now() - pd.Timestamp(coverage["updated"]) > ttl:
+        return coverage["end"]
+    return provisional_end
+
+
+def get_missing_ranges(
+    coverage: dict | None, start: pd.Timestamp, end: pd.Timestamp
+) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+    """
+    Returns the date ranges between start and end that are not covered by the price store.
+
+    Only a head segment before and a tail segment after the covered range can be missing,
+    which keeps the covered range contiguous.
+    """
+    if coverage is None:
+        return [(start, end)]
+
+    one_day = pd.Timedelta(days=1)
+    covered_end = get_covered_end(coverage)
+    missing = []
+    if start < coverage["start"]:
+        missing.append((start, coverage["start"] - one_day))
+    if end > covered_end:
+        missing.append((covered_end + one_day, end))
+    return missing
+
+
+def read_prices(
+    ticker: str,
+    start: pd.Timestamp | None = None,
+    end: pd.Timestamp | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Read the stored daily prices for the ticker, optionally limited to a date range and columns.
+
+    Only the requested columns and the row groups that overlap the date range are read.
+    """
+    price_store_path = get_price_store_path(ticker)
+    if not price_store_path.exists():
+        return pd.DataFrame()
+
+    filters = []
+    if start is not None:
+        filters.append(("date", ">=", start))
+    if end is not None:
+        filters.append(("date", "<=", end))
+    return pd.read_parquet(price_store_path, columns=columns, filters=filters or None)
+
+
+def write_prices(
+    ticker: str,
+    df: pd.DataFrame,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    provisional_end: pd.Timestamp | None = None,
+) -> None:
+    """
+    Write the daily prices for the ticker to the price store, along with the covered range.
+
+    The files are written to temporary files first and then renamed, so that an interrupted
+    write never leaves a partially written price store behind.
+
+    Args:
+        ticker: The stock ticker
+        df: DataFrame with a DatetimeIndex named 'date'
+        start: The start of the date range covered by the prices
+        end: The end of the date range covered by the prices
+        provisional_end: The last fetched date after end, whose bar may still change
+    """
+    price_store_path = get_price_store_path(ticker)
+    price_store_path.parent.mkdir(parents=True, exist_ok=True)
+
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    df.index.name = "date"
+    if defaults["price_store_float32"]:
+        float_cols = df.select_dtypes("float64").columns
+        df = df.astype(dict.fromkeys(float_cols, "float32"))
+
+    tmp_path = price_store_path.with_suffix(".parquet.tmp")
+    df.to_parquet(tmp_path)
+    tmp_path.replace(price_store_path)
+
+    coverage = dict(
+        start=start.date().isoformat(),
+        end=end.date().isoformat(),
+        updated=dt.datetime.now().isoformat(timespec="seconds"),
+    )
+    if provisional_end is not None and provisional_end > end:
+        coverage["provisional_end"] = provisional_end.date().isoformat()
+    coverage_path = get_price_coverage_path(ticker)
+    tmp_path = coverage_path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(coverage), encoding="utf-8")
+    tmp_path.replace(coverage_path)
+    logger.info(f"Stored {len(df)} daily prices for {ticker} in '{price_store_path}'")
+
+
+def load_price_panel(
+    tickers: list[str], start: dt.date | str, end: dt.date | str, column: str = "close"
+) -> pd.DataFrame:
+    """
+    Load one price column for many tickers from the price store.
+
+    Only the date and the given column are read for each ticker with pyarrow, and the values
+    are placed directly into a dates x tickers matrix. Tickers without stored prices are skipped.
+
+    Returns:
+        DataFrame with dates as index and tickers as columns.
+    """
+    import pyarrow.parquet as pq
+
+    start_date = pd.Timestamp(start).normalize().to_datetime64()
+    end_date = pd.Timestamp(end).normalize().to_datetime64()
+    series = {}
+    for ticker in tickers:
+        price_store_path = get_price_store_path(ticker)
+        if not price_store_path.exists():
+            continue
+        table = pq.ParquetFile(price_store_path).read(columns=["date", column])
+        dates = table.column("date").to_numpy()
+        mask = (dates >= start_date) & (dates <= end_date)
+        series[ticker] = (dates[mask], table.column(column).to_numpy()[mask])
+
+    if not series:
+        return pd.DataFrame()
+
+    index = np.unique(np.concatenate([dates for dates, _ in series.values()]))
+    values = np.full((len(index), len(series)), np.nan)
+    for i, (dates, ticker_values) in enumerate(series.values()):
+        values[np.searchsorted(index, dates), i] = ticker_values
+    return pd.DataFrame(values, index=pd.DatetimeIndex(index, name="date"), columns=list(series))
@@ -0,0 +1,109 @@
+import datetime as dt
+
+import pandas as pd
+
+from finmas.data.as_of import filter_fundamentals_panel_as_of
+from finmas.data.market.fundamentals import (
+    ESSENTIAL_BALANCE_COLS,
+    ESSENTIAL_INCOME_COLS,
+    compute_essential_metrics,
+)
+from finmas.data.market.fundamentals_store import INDEX_COL, load_fundamentals_dataset
+from finmas.data.market.price_store import load_price_panel
+from finmas.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Metrics in the screening table, renamed to names that can be used in a query
+SCREENER_COLS_MAP = {
+    INDEX_COL: "date",
+    "close": "close",
+    "totalRevenue_ttm": "revenue_ttm",
+    "totalRevenue_ttm_yoy": "revenue_ttm_yoy",
+    "totalRevenue_qoq": "revenue_qoq",
+    "netIncome_ttm": "net_income_ttm",
+    "netIncome_ttm_yoy": "net_income_ttm_yoy",
+    "netProfitMargin_ttm": "net_margin_ttm",
+    "netProfitMargin_ttm_yoy": "net_margin_ttm_yoy",
+    "basic_eps_ttm": "eps_ttm",
+    "basic_eps_ttm_yoy": "eps_ttm_yoy",
+    "basic_P/E_ttm": "pe_ttm",
+    "P/S_ttm": "ps_ttm",
+    "D/E": "de",
+}
+
+
+def get_screener_df(
+    tickers: list[str] | None = None, as_of: dt.date | str | None = None
+) -> pd.DataFrame:
+    """
+    Compute the essential metrics of the latest fiscal quarter for many tickers at once.
+
+    The quarterly income statements and balance sheets are read from the fundamentals store,
+    and the close prices are read from the price store. The stock price of each quarter is
+    the close price at the end of the fiscal quarter, as in `get_ticker_essentials`.
+
+    Args:
+        tickers: The tickers to include. Defaults to all tickers in the fundamentals store.
+        as_of: Only use the fiscal quarters that were publicly available on this date.
+            If None, the fiscal quarters are not restricted, as in `get_ticker_essentials`.
+
+    Returns:
+        DataFrame with one row per ticker and the columns in SCREENER_COLS_MAP.
+    """
+    as_of_date = pd.Timestamp(as_of).normalize() if as_of is not None else None
+
+    income_df = load_fundamentals_dataset(
+        "income", "Quarterly", tickers=tickers, columns=ESSENTIAL_INCOME_COLS
+    )
+    if income_df.empty:
+        return pd.DataFrame(columns=list(SCREENER_COLS_MAP.values()))
+    balance_df = load_fundamentals_dataset(
+        "balance", "Quarterly", tickers=tickers, columns=ESSENTIAL_BALANCE_COLS
+    )
+    if as_of_date is not None:
+        income_df = filter_fundamentals_panel_as_of(income_df, freq="Quarterly", as_of=as_of_date)
+        balance_df = filter_fundamentals_panel_as_of(balance_df, freq="Quarterly", as_of=as_of_date)
+    df = income_df.join(balance_df)
+
+    # Close price at the end of each fiscal quarter
+    fiscal_dates = df.index.get_level_values(INDEX_COL)
+    close_df = load_price_panel(
+        df.index.get_level_values("ticker").unique().tolist(),
+        start=fiscal_dates.min() - pd.Timedelta(days=7),
+        end=as_of_date or pd.Timestamp.today().normalize(),
+    )
+    if close_df.empty:
+        df["close"] = float("nan")
+    else:
+        close_df = close_df.reindex(close_df.index.union(fiscal_dates.unique())).ffill()
+        close = close_df.stack().swaplevel()
+        close.index.names = ["ticker", INDEX_COL]
+        df["close"] = close.reindex(df.index).to_numpy()
+
+    df = compute_essential_metrics(df)
+    df = df.groupby(level="ticker", sort=False).tail(1).reset_index(level=INDEX_COL)
+    return df[list(SCREENER_COLS_MAP)].rename(columns=SCREENER_COLS_MAP)
+
+
+def screen_tickers(
+    query: str | None = None,
+    tickers: list[str] | None = None,
+    as_of: dt.date | str | None = None,
+) -> pd.DataFrame:
+    """
+    Filter the screening table with a query, e.g. "pe_ttm < 20 and revenue_ttm_yoy > 10".
+
+    The query is evaluated with `DataFrame.query` on the columns in SCREENER_COLS_MAP.
+    Growth rates and margins are in percent.
+
+    Args:
+        query: The query to filter the tickers with. If None, all tickers are returned.
+        tickers: The tickers to screen. Defaults to all tickers in the fundamentals store.
+        as_of: The as-of date. If None, the fiscal quarters are not restricted.
+    """
+    df = get_screener_df(tickers=tickers, as_of=as_of)
+    if query:
+        df = df.query(query)
+    logger.info(f"{len(df)} tickers match the screening query '{query}'")
+    return df
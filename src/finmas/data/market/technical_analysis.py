@@ -1,4 +1,7 @@
+import copy
 import datetime as dt
+import math
+from dataclasses import dataclass, field
 
 import numpy as np
 import pandas as pd
@@ -8,7 +11,9 @@ from ta.momentum import rsi
 from ta.trend import sma_indicator
 from ta.volatility import bollinger_pband
 
+from finmas.cache_config import cache
 from finmas.constants import defaults
+from finmas.data.market.price_store import load_price_panel
 from finmas.data.market.tiingo import get_price_data
 from finmas.logger import get_logger
 from finmas.utils.common import extract_cols_from_df, get_text_content_file
@@ -26,6 +31,9 @@ TA_COLS_MAP = {
     "bb_pband": "Bollinger Band Percentage %",
 }
 
+# Increment when the indicator state changes, so that persisted states are rebuilt
+INDICATOR_STATE_VERSION = 1
+
 
 class TechnicalAnalysisInput(BaseModel):
     """Input schema for StockFundamentalsTool."""
@@ -47,8 +55,7 @@ class TechnicalAnalysisTool(BaseTool):
 
     def _run(self, ticker: str) -> str:
         """Function that returns essential technical indicators and price for a given ticker in a Markdown table format."""
-        start = (self.end_date - pd.DateOffset(years=5)).date()
-        df: pd.DataFrame = get_technical_indicators(ticker, start=start, end=self.end_date)
+        df = get_technical_indicators_online(ticker, end=self.end_date)
         df = df.tail(NUM_PERIODS)
         df = df.dropna(axis=0, how="any")
         assert isinstance(df.index, pd.DatetimeIndex)
@@ -128,3 +135,268 @@ def get_technical_indicators(ticker: str, start: dt.date, end: dt.date) -> pd.Da
     df["ret_1w"] = df["close"].pct_change(periods=1)
 
     return df
+
+
+@dataclass
+class IndicatorState:
+    """
+    Online state of the weekly technical indicators for a ticker.
+
+    The state holds the rolling sums for the SMAs, the last 50 weekly closes and the
+    Wilder averages for the RSI, so that a new weekly close updates the indicators in O(1).
+    The last indicator rows are kept, so that they can be read without any computation.
+    The indicators match get_technical_indicators.
+    """
+
+    week_end: pd.Timestamp | None = None
+    closes: list[float] = field(default_factory=list)
+    sum_20: float = 0.0
+    sum_50: float = 0.0
+    avg_up: float = math.nan
+    avg_down: float = math.nan
+    num_closes: int = 0
+    rows: list[dict] = field(default_factory=list)
+    version: int = INDICATOR_STATE_VERSION
+
+    def update(self, week_end: pd.Timestamp, close: float) -> dict:
+        """Update the state with the close of a new week, and return the indicator row."""
+        prev_close = self.closes[-1] if self.closes else math.nan
+        self.week_end = week_end
+        self.num_closes += 1
+        self.closes.append(close)
+        self.sum_20 += close
+        self.sum_50 += close
+        if len(self.closes) > 20:
+            self.sum_20 -= self.closes[-21]
+        if len(self.closes) > 50:
+            self.sum_50 -= self.closes.pop(0)
+
+        sma_20 = self.sum_20 / 20 if len(self.closes) >= 20 else math.nan
+        sma_50 = self.sum_50 / 50 if len(self.closes) >= 50 else math.nan
+
+        # Wilder smoothing of the up and down moves, as in ta.momentum.rsi
+        diff = close - prev_close
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        alpha = 1 / 14
+        if math.isnan(self.avg_up):
+            self.avg_up, self.avg_down = up, down
+        else:
+            self.avg_up = (1 - alpha) * self.avg_up + alpha * up
+            self.avg_down = (1 - alpha) * self.avg_down + alpha * down
+        rsi_14 = math.nan
+        if self.num_closes >= 14:
+            rsi_14 = 100.0 if self.avg_down == 0 else 100 - 100 / (1 + self.avg_up / self.avg_down)
+
+        bb_pband = math.nan
+        if len(self.closes) >= 20:
+            std_20 = float(np.std(self.closes[-20:]))
+            hband, lband = sma_20 + 2 * std_20, sma_20 - 2 * std_20
+            if hband != lband:
+                bb_pband = (close - lband) / (hband - lband) * 100
+
+        if close > sma_50:
+            sma_trend = "Up"
+        elif close < sma_20 and close < sma_50:
+            sma_trend = "Down"
+        else:
+            sma_trend = "Neutral"
+
+        row = dict(
+            date=week_end,
+            close=close,
+            sma_20=sma_20,
+            sma_50=sma_50,
+            sma_trend=sma_trend,
+            rsi_14=rsi_14,
+            bb_pband=bb_pband,
+        )
+        self.rows = [*self.rows[-(NUM_PERIODS - 1) :], row]
+        return row
+
+
+def get_technical_indicators_online(ticker: str, end: dt.date) -> pd.DataFrame:
+    """
+    Get the latest weekly technical indicators for a given stock ticker.
+
+    The indicator state of the ticker is persisted in the cache, and only the prices
+    after the last completed week in the state are read and applied. A week that is not
+    completed at the end date is applied to a copy of the state, and is not persisted.
+    If the end date is before the last week in the state, the indicators are computed
+    from the full history with get_technical_indicators.
+
+    Args:
+        ticker: The stock ticker symbol.
+        end: The end date for the historical data.
+
+    Returns:
+        DataFrame with the last `technical_analysis_periods` weeks of technical indicators.
+    """
+    end_date = pd.Timestamp(end).normalize()
+    cache_key = f"technical_indicator_state:{ticker}"
+    state = cache.get(cache_key)
+    if state is not None and state.version != INDICATOR_STATE_VERSION:
+        state = None
+
+    if state is not None and state.week_end > end_date:
+        start = (end_date - pd.DateOffset(years=5)).date()
+        return get_technical_indicators(ticker, start=start, end=end_date.date())
+
+    if state is None:
+        state = IndicatorState()
+        start_date = end_date - pd.DateOffset(years=5)
+    else:
+        start_date = state.week_end + pd.Timedelta(days=1)
+
+    weekly_close = pd.Series(dtype="float64", index=pd.DatetimeIndex([]))
+    if start_date <= end_date:
+        df = get_price_data(ticker, start=start_date.date(), end=end_date.date())
+        if not df.empty:
+            weekly_close = df["close"].resample("W-FRI").last().dropna()
+
+    # A week is completed when its Friday is both within the end date and before today
+    today = pd.Timestamp.today().normalize()
+    is_completed = (weekly_close.index <= end_date) & (weekly_close.index < today)
+    for week_end, close in weekly_close[is_completed].items():
+        state.update(week_end, float(close))
+    if is_completed.any():
+        cache.set(cache_key, state)
+
+    rows = list(state.rows)
+    partial_week = weekly_close[~is_completed]
+    if not partial_week.empty:
+        partial_state = copy.deepcopy(state)
+        rows.append(partial_state.update(partial_week.index[-1], float(partial_week.iloc[-1])))
+
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows[-NUM_PERIODS:]).set_index("date")
+
+
+def _rolling_window(values: np.ndarray, window: int) -> np.ndarray:
+    """Returns a view of shape (dates - window + 1, tickers, window) with the rolling windows."""
+    return np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling mean over the rows. Windows containing NaN are NaN, as in pandas."""
+    result = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        result[window - 1 :] = _rolling_window(values, window).mean(axis=-1)
+    return result
+
+
+def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling population standard deviation (ddof=0) over the rows."""
+    result = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        result[window - 1 :] = _rolling_window(values, window).std(axis=-1)
+    return result
+
+
+def _rsi(close: np.ndarray, window: int) -> np.ndarray:
+    """
+    Relative Strength Index with Wilder smoothing, matching ta.momentum.rsi.
+
+    The smoothing of each ticker starts at its first valid close,
+    so that tickers with a shorter history give the same result as a single ticker series.
+    """
+    started = np.maximum.accumulate(~np.isnan(close), axis=0)
+    diff = np.diff(close, axis=0, prepend=np.nan)
+    with np.errstate(invalid="ignore"):
+        up = np.where(diff > 0, diff, 0.0)
+        down = np.where(diff < 0, -diff, 0.0)
+
+    alpha = 1 / window
+    emaup = np.full(close.shape, np.nan)
+    emadn = np.full(close.shape, np.nan)
+    state_up = np.full(close.shape[1], np.nan)
+    state_dn = np.full(close.shape[1], np.nan)
+    count = np.zeros(close.shape[1])
+    for i in range(len(close)):
+        state_up = np.where(np.isnan(state_up), up[i], (1 - alpha) * state_up + alpha * up[i])
+        state_dn = np.where(np.isnan(state_dn), down[i], (1 - alpha) * state_dn + alpha * down[i])
+        state_up = np.where(started[i], state_up, np.nan)
+        state_dn = np.where(started[i], state_dn, np.nan)
+        count += started[i]
+        emaup[i] = np.where(count >= window, state_up, np.nan)
+        emadn[i] = np.where(count >= window, state_dn, np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative_strength = emaup / emadn
+        return np.where(emadn == 0, 100, 100 - (100 / (1 + relative_strength)))
+
+
+def get_technical_indicators_panel(close: pd.DataFrame) -> pd.DataFrame:
+    """
+    Get technical indicators for many tickers at once.
+
+    The indicators are computed with NumPy over all tickers, and match the output
+    of get_technical_indicators for each ticker.
+
+    Args:
+        close: DataFrame of daily close prices with dates as index and tickers as columns.
+
+    Returns:
+        DataFrame of weekly values with columns (indicator, ticker) for the indicators
+        close, SMA 20/50, SMA trend, RSI 14, Bollinger Band percentage and 1 week return.
+    """
+    weekly_close = close.resample("W-FRI").last()
+    values = weekly_close.to_numpy(dtype="float64")
+
+    sma_20 = _rolling_mean(values, 20)
+    sma_50 = _rolling_mean(values, 50)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std_20 = _rolling_std(values, 20)
+        hband, lband = sma_20 + 2 * std_20, sma_20 - 2 * std_20
+        bb_pband = (values - lband) / np.where(hband != lband, hband - lband, np.nan) * 100
+        ret_1w = np.full(values.shape, np.nan)
+        ret_1w[1:] = values[1:] / values[:-1] - 1
+        sma_trend = np.where(
+            values > sma_50,
+            "Up",
+            np.where((values < sma_20) & (values < sma_50), "Down", "Neutral"),
+        )
+
+    indicators = {
+        "close": values,
+        "sma_20": sma_20,
+        "sma_50": sma_50,
+        "sma_trend": sma_trend,
+        "rsi_14": _rsi(values, 14),
+        "bb_pband": bb_pband,
+        "ret_1w": ret_1w,
+    }
+    return pd.concat(
+        {
+            name: pd.DataFrame(data, index=weekly_close.index, columns=weekly_close.columns)
+            for name, data in indicators.items()
+        },
+        axis=1,
+    )
+
+
+def get_latest_technical_indicators(
+    tickers: list[str], end: dt.date, years: int = 5
+) -> pd.DataFrame:
+    """
+    Get the latest weekly technical indicators for many tickers from the local price store.
+
+    No prices are fetched, so tickers without stored prices are left out.
+    The result can be used to scan a universe of tickers, e.g. for oversold tickers
+    with `df[df["rsi_14"] < 30]`.
+
+    Args:
+        tickers: List of tickers
+        end: The end date for the historical data.
+        years: Number of years of price history used for the indicators.
+
+    Returns:
+        DataFrame with the tickers as index and the indicators as columns.
+    """
+    start = (pd.Timestamp(end) - pd.DateOffset(years=years)).date()
+    close = load_price_panel(tickers, start=start, end=end, column="close")
+    if close.empty:
+        return pd.DataFrame()
+    panel = get_technical_indicators_panel(close)
+    return panel.iloc[-1].unstack(level=0).infer_objects()
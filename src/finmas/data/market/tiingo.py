@@ -5,7 +5,14 @@ import pandas as pd
 from dotenv import find_dotenv, load_dotenv
 from tiingo import TiingoClient
 
-from finmas.cache_config import cache
+from finmas.constants import defaults
+from finmas.data.market.price_store import (
+    get_missing_ranges,
+    get_ticker_lock,
+    load_price_coverage,
+    read_prices,
+    write_prices,
+)
 from finmas.logger import get_logger
 from finmas.utils.common import date_to_str
 
@@ -13,21 +20,19 @@ load_dotenv(find_dotenv())
 
 logger = get_logger(__name__)
 
+# Relative tolerance when comparing the stored adjusted close with the refreshed one
+ADJUSTMENT_TOLERANCE = 1e-6
 
-@cache.memoize(expire=dt.timedelta(days=1).total_seconds())
-def get_price_data(ticker: str, start: dt.date | str, end: dt.date | str) -> pd.DataFrame:
+
+def fetch_price_data(ticker: str, start: dt.date | str, end: dt.date | str) -> pd.DataFrame:
     """
-    Get historical price data for a given stock ticker.
+    Fetch historical price data for a given stock ticker from Tiingo.
 
     Args:
         ticker: The stock ticker symbol.
         start: The start date for the historical data.
         end: The end date for the historical data.
     """
-    if os.getenv("TIINGO_API_KEY") is None:
-        logger.error("TIINGO_API_KEY environment variable not set.")
-        return pd.DataFrame()
-
     start, end = date_to_str(start), date_to_str(end)
 
     client = TiingoClient({"session": True, "api_key": os.getenv("TIINGO_API_KEY")})
@@ -37,8 +42,154 @@ def get_price_data(ticker: str, start: dt.date | str, end: dt.date | str) -> pd.
         startDate=start,
         endDate=end,
     )
+    if df.empty:
+        return pd.DataFrame()
 
     df.columns = df.columns.str.lower()
     assert isinstance(df.index, pd.DatetimeIndex)
     df.index = df.index.tz_localize(None)
     return df
+
+
+def get_price_data(ticker: str, start: dt.date | str, end: dt.date | str) -> pd.DataFrame:
+    """
+    Get historical price data for a given stock ticker.
+
+    The prices are served from the local price store. Only the head or tail segments
+    of the requested range that are not covered by the store are fetched from Tiingo
+    and merged into the store. The bar for today may change until the market closes,
+    so it is only served from the store for `price_today_ttl_minutes` after it was fetched.
+    A tail segment is fetched from the last complete stored bar, and the full range is
+    fetched again if the stored adjusted prices are outdated because of a split or dividend.
+
+    Args:
+        ticker: The stock ticker symbol.
+        start: The start date for the historical data.
+        end: The end date for the historical data.
+    """
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+
+    with get_ticker_lock(ticker):
+        coverage = load_price_coverage(ticker)
+        missing_ranges = get_missing_ranges(coverage, start, end)
+        if missing_ranges:
+            if os.getenv("TIINGO_API_KEY") is None:
+                logger.error("TIINGO_API_KEY environment variable not set.")
+                return read_prices(ticker, start, end)
+
+            stored_df = read_prices(ticker) if coverage else pd.DataFrame()
+            frames = [stored_df]
+            readjust = False
+            for range_start, range_end in missing_ranges:
+                last_date = None
+                if coverage and not stored_df.empty and range_start > coverage["end"]:
+                    # The tail overlaps the last complete bar to verify the adjusted prices
+                    last_date = get_last_complete_date(stored_df, coverage)
+                    range_start = min(range_start, last_date)
+                logger.info(
+                    f"Fetching prices for {ticker} from {range_start:%Y-%m-%d} to {range_end:%Y-%m-%d}"
+                )
+                df = fetch_price_data(ticker, range_start.date(), range_end.date())
+                if last_date is not None and not df.empty:
+                    readjust = needs_readjustment(stored_df, df, last_date)
+                    if readjust:
+                        break
+                frames.append(df)
+
+            yesterday = pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
+            coverage_start, coverage_end = start, min(end, yesterday)
+            if coverage:
+                coverage_start = min(coverage_start, coverage["start"])
+                coverage_end = max(coverage_end, coverage["end"])
+            if readjust:
+                logger.info(f"Adjusted prices for {ticker} changed. Refetching the full history")
+                full_start, full_end = pd.Timestamp(coverage_start), pd.Timestamp(end)
+                frames = [fetch_price_data(ticker, full_start.date(), full_end.date())]
+
+            frames = [frame for frame in frames if not frame.empty]
+            if not frames:
+                return pd.DataFrame()
+            write_prices(
+                ticker,
+                pd.concat(frames),
+                start=coverage_start,
+                end=coverage_end,
+                provisional_end=end,
+            )
+
+    return read_prices(ticker, start, end)
+
+
+def get_last_complete_date(stored_df: pd.DataFrame, coverage: dict) -> pd.Timestamp:
+    """Returns the date of the last stored bar that can no longer change."""
+    # A bar for the current day may have been stored before the market closed
+    complete_dates = stored_df.index[stored_df.index <= coverage["end"]]
+    return complete_dates.max() if len(complete_dates) else stored_df.index.max()
+
+
+def needs_readjustment(
+    stored_df: pd.DataFrame, new_df: pd.DataFrame, last_date: pd.Timestamp
+) -> bool:
+    """
+    Check whether the adjusted prices in the store are outdated.
+
+    Tiingo adjusts the whole price history for splits and dividends. The stored adjusted
+    prices must be refetched when a new bar has a dividend or a split, or when the adjusted
+    close of the overlapping bars differs from the stored adjusted close.
+
+    Args:
+        stored_df: The prices in the store
+        new_df: The refreshed prices starting at last_date
+        last_date: The date of the last complete bar in the store
+    """
+    new_bars = new_df[new_df.index > last_date]
+    if (new_bars["divcash"] != 0).any() or (new_bars["splitfactor"] != 1).any():
+        return True
+
+    overlap = new_df.index[new_df.index <= last_date].intersection(stored_df.index)
+    stored_adjclose = stored_df.loc[overlap, "adjclose"].astype("float64")
+    new_adjclose = new_df.loc[overlap, "adjclose"].astype("float64")
+    return not (
+        (stored_adjclose - new_adjclose).abs() <= ADJUSTMENT_TOLERANCE * new_adjclose.abs()
+    ).all()
+
+
+def refresh_price_data(ticker: str) -> str:
+    """
+    Refresh the stored daily prices for a ticker with the bars after the last stored date.
+
+    The last complete bar in the store is fetched again to verify the adjusted prices.
+    The full covered range is refetched if the adjusted prices are outdated because of
+    a split or dividend. A ticker without stored prices gets `price_history_years` of history.
+
+    Returns:
+        The action taken: 'created', 'updated', 'readjusted' or 'unchanged'.
+    """
+    today = pd.Timestamp.today().normalize()
+    yesterday = today - pd.Timedelta(days=1)
+
+    with get_ticker_lock(ticker):
+        coverage = load_price_coverage(ticker)
+        stored_df = read_prices(ticker) if coverage else pd.DataFrame()
+        if coverage is None or stored_df.empty:
+            start = today - pd.DateOffset(years=defaults["price_history_years"])
+            df = fetch_price_data(ticker, start.date(), today.date())
+            if df.empty:
+                return "unchanged"
+            write_prices(ticker, df, start=start, end=yesterday)
+            return "created"
+
+        last_date = get_last_complete_date(stored_df, coverage)
+        new_df = fetch_price_data(ticker, last_date.date(), today.date())
+        if new_df.empty or new_df.index.max() <= last_date:
+            return "unchanged"
+
+        if needs_readjustment(stored_df, new_df, last_date):
+            logger.info(f"Adjusted prices for {ticker} changed. Refetching the full history")
+            df = fetch_price_data(ticker, coverage["start"].date(), today.date())
+            write_prices(ticker, df, start=coverage["start"], end=yesterday)
+            return "readjusted"
+
+        df = pd.concat([stored_df, new_df])
+        write_prices(ticker, df, start=coverage["start"], end=max(yesterday, coverage["end"]))
+        return "updated"
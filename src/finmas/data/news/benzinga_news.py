@@ -1,9 +1,8 @@
 import datetime as dt
 import os
-import pickle
-import re
-import unicodedata
-from pathlib import Path
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from alpaca.data.historical.news import NewsClient
 from alpaca.data.models import News, NewsSet
@@ -13,6 +12,13 @@ from html_to_markdown import convert_to_markdown
 
 from finmas.constants import defaults
 from finmas.data.news.news_fetcher import NewsFetcherBase
+from finmas.data.news.news_store import (
+    add_coverage,
+    get_uncovered_ranges,
+    read_articles,
+    store_articles,
+)
+from finmas.data.news.text_cleaner import NewsTextCleaner
 from finmas.logger import get_logger, log_execution_time
 from finmas.utils.common import to_datetime
 
@@ -21,98 +27,256 @@ logger = get_logger(__name__)
 BENZINGA_NEWS_LIMIT = 50
 
 
-SENTENCES_IGNORE_LIST = [
-    "disclaimer",
-    "benzinga",
-    "photo by",
-    "see also",
-    "shutterstock",
-    "read next",
-    "click here",
-]
-HEADLINE_IGNORE_LIST = ["market clubhouse", "options", "bonds"]
+SENTENCES_IGNORE_LIST = defaults["news_sentences_ignore_list"]
+HEADLINE_IGNORE_LIST = defaults["news_headline_ignore_list"]
 MAX_NUM_SYMBOLS = defaults["news_max_num_symbols"]
 
+text_cleaner = NewsTextCleaner(
+    SENTENCES_IGNORE_LIST, HEADLINE_IGNORE_LIST, cleaner=defaults["news_text_cleaner"]
+)
 
-def condense_newline(text):
-    """Helper to reduce consecutive newlines into single newline."""
-    return "\n".join([p for p in re.split("\n|\r", text) if len(p) > 0])
+# Below this number of articles, the conversion is faster in the current process
+PARALLEL_CONVERSION_MIN_ARTICLES = 20
+
+
+def get_soup_text(soup: BeautifulSoup) -> str:
+    """
+    Returns the clean text of the paragraphs and lists in a parsed Benzinga news article.
+
+    Sentences that contain a phrase from SENTENCES_IGNORE_LIST are removed.
+    """
+    TAGS = ["p", "ul"]
+    filtered_text_list = []
+    for tag in soup.find_all(TAGS):
+        filtered_text_list.extend(text_cleaner.get_sentences(tag.text))
+
+    return " ".join(filtered_text_list)
+
+
+def convert_benzinga_content(html_content: str) -> tuple[str, str]:
+    """
+    Convert the HTML content of a Benzinga news article to Markdown and clean text.
+
+    The HTML is parsed once, and tables are removed from both outputs.
+    The function is defined at module level so that it can be run in a process pool.
+
+    Returns:
+        Tuple of the Markdown content and the text.
+    """
+    soup = BeautifulSoup(html_content, "html.parser")
+    for table in soup.find_all("table"):
+        table.decompose()
+
+    text = get_soup_text(soup)
+    markdown_content = convert_to_markdown(
+        source=soup,
+        autolinks=False,
+        escape_misc=False,
+        heading_style="atx",
+        strip=["a", "table", "thead", "tbody", "td", "tr", "th", "img"],
+        wrap=True,
+        wrap_width=100,
+    )
+    return (markdown_content, text)
+
+
+def convert_benzinga_contents(html_contents: list[str]) -> list[tuple[str, str]]:
+    """
+    Convert the HTML content of many Benzinga news articles to Markdown and clean text.
+
+    The articles are spread across a pool of `news_conversion_processes` processes
+    when there are enough articles to make up for starting the processes.
+    """
+    max_workers = defaults["news_conversion_processes"] or os.cpu_count() or 1
+    if max_workers <= 1 or len(html_contents) < PARALLEL_CONVERSION_MIN_ARTICLES:
+        return [convert_benzinga_content(html_content) for html_content in html_contents]
+
+    chunksize = max(1, len(html_contents) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(convert_benzinga_content, html_contents, chunksize=chunksize))
+
+
+def get_date_shards(
+    start: dt.datetime, end: dt.datetime, shard_days: int
+) -> list[tuple[dt.datetime, dt.datetime]]:
+    """Split the date range into consecutive shards of at most shard_days days."""
+    shard_length = dt.timedelta(days=shard_days)
+    shards = []
+    shard_start = start
+    while shard_start < end:
+        shard_end = min(shard_start + shard_length, end)
+        shards.append((shard_start, shard_end))
+        shard_start = shard_end
+    return shards
+
+
+def filter_news_records(records: list[dict]) -> list[dict]:
+    """
+    Filter out news articles that are unlikely to be relevant for a ticker.
+
+    Articles with a headline from HEADLINE_IGNORE_LIST and articles tagged with more than
+    `news_max_num_symbols` symbols are removed.
+    """
+    return [
+        record
+        for record in records
+        if not text_cleaner.is_ignored_headline(record["title"])
+        and record["num_symbols"] <= MAX_NUM_SYMBOLS
+    ]
 
 
 class BenzingaNewsFetcher(NewsFetcherBase):
-    @log_execution_time(logger)
     def get_news(
         self, ticker: str, start: dt.datetime | None = None, end: dt.datetime | None = None
     ) -> list[dict]:
         """
         Getting Benzing News using the Alpaca Historical News articles API.
 
+        The articles are served from the local news store with a range query. Only the parts
+        of the date range that have not been fetched for the ticker are fetched from Alpaca.
+        The headline and number of symbols filters are applied when the articles are read.
+
         Ref: https://docs.alpaca.markets/reference/news-3
         """
+        return self.get_watchlist_news([ticker], start=start, end=end)[ticker]
+
+    @log_execution_time(logger)
+    def get_watchlist_news(
+        self, tickers: list[str], start: dt.datetime | None = None, end: dt.datetime | None = None
+    ) -> dict[str, list[dict]]:
+        """
+        Getting Benzinga News for a watchlist of tickers with combined symbol requests.
+
+        Tickers that are missing the same date ranges in the news store are fetched together,
+        with at most `news_symbols_per_request` symbols in each request. Each article is stored
+        once and indexed under every symbol it is tagged with, so an article about several
+        tickers in the watchlist is only downloaded and converted once. The headline and number
+        of symbols filters are applied per ticker when the articles are read.
+
+        Returns:
+            Dictionary with the filtered news records for each ticker.
+        """
         if start is None:
             start = to_datetime(defaults["news_start_date"])
         if end is None:
             end = to_datetime(defaults["news_end_date"])
 
-        news_dir = Path(defaults["data_dir"]) / "benzinga_news" / ticker
-        news_dir.mkdir(parents=True, exist_ok=True)
-        filename = f"{start.strftime('%Y-%m-%d')}_{end.strftime('%Y-%m-%d')}.pkl"
-        file_path = news_dir / filename
-        if file_path.exists():
-            logger.info(f"Loading news data from '{file_path}'")
-            with open(file_path, "rb") as file:
-                return pickle.load(file)
+        symbols_per_request = defaults["news_symbols_per_request"]
+        if not defaults["save_news_data"]:
+            records_by_id: dict[int, dict] = {}
+            for i in range(0, len(tickers), symbols_per_request):
+                records, _ = self.fetch_news(tickers[i : i + symbols_per_request], start, end)
+                records_by_id.update((record["id"], record) for record in records)
+            return {
+                ticker: filter_news_records(
+                    [record for record in records_by_id.values() if ticker in record["symbols"]]
+                )
+                for ticker in tickers
+            }
 
-        assert os.getenv("ALPACA_API_KEY") and os.getenv("ALPACA_API_SECRET")
+        tickers_by_ranges: defaultdict[tuple, list[str]] = defaultdict(list)
+        for ticker in tickers:
+            tickers_by_ranges[tuple(get_uncovered_ranges(ticker, start, end))].append(ticker)
 
-        client = NewsClient(
-            api_key=os.getenv("ALPACA_API_KEY"), secret_key=os.getenv("ALPACA_API_SECRET")
-        )
-        start = start or dt.datetime.now() - dt.timedelta(days=14)
-
-        page_token = None
-        news_list: list[News] = []
-        while True:
-            request = NewsRequest(
-                symbols=ticker,
-                start=start,
-                end=end or dt.datetime.now(),
-                include_content=True,
-                exclude_contentless=True,
-                limit=BENZINGA_NEWS_LIMIT,
-                page_token=page_token,
-            )
-            news_set = client.get_news(request_params=request)
-            assert isinstance(news_set, NewsSet)
-            news_list.extend(news_set.data["news"])
+        now = dt.datetime.now(dt.UTC)
+        for uncovered_ranges, range_tickers in tickers_by_ranges.items():
+            for i in range(0, len(range_tickers), symbols_per_request):
+                symbols = range_tickers[i : i + symbols_per_request]
+                for range_start, range_end in uncovered_ranges:
+                    logger.info(
+                        f"Fetching Benzinga News for {symbols} from {range_start:%Y-%m-%d %H:%M} "
+                        f"to {range_end:%Y-%m-%d %H:%M}"
+                    )
+                    records, fetched_shards = self.fetch_news(symbols, range_start, range_end)
+                    store_articles(records)
+                    for shard_start, shard_end in fetched_shards:
+                        # News can still be published for the part of the shard in the future
+                        if shard_start < now:
+                            for symbol in symbols:
+                                add_coverage(symbol, shard_start, min(shard_end, now))
 
-            page_token = news_set.next_page_token
-            if page_token is None or len(news_set.data["news"]) < BENZINGA_NEWS_LIMIT:
-                break
+        return {
+            ticker: filter_news_records(read_articles(ticker, start, end)) for ticker in tickers
+        }
 
-        records = []
+    def fetch_news(
+        self, symbols: list[str], start: dt.datetime, end: dt.datetime
+    ) -> tuple[list[dict], list[tuple[dt.datetime, dt.datetime]]]:
+        """
+        Fetch the Benzinga News articles with content for any of the symbols from Alpaca.
+
+        The date range is split into shards of `news_shard_days` days that are paginated
+        concurrently by `news_max_workers` threads. At most `news_request_budget` requests
+        are sent, and a shard that is not fetched completely within the budget is left out
+        of the fetched shards. The articles are merged and de-duplicated by id, and the
+        HTML content of the articles is converted to Markdown and text.
+
+        Returns:
+            The article records and the date shards that were fetched completely.
+        """
+        assert os.getenv("ALPACA_API_KEY") and os.getenv("ALPACA_API_SECRET")
+
+        request_budget = defaults["news_request_budget"]
+        num_requests = 0
+        lock = threading.Lock()
 
-        # Filter out news items from a fixed headline ignore list
-        news_items = []
-        for news in news_list:
-            if (
-                not any(
-                    ignore_headline.lower() in news.headline.lower()
-                    for ignore_headline in HEADLINE_IGNORE_LIST
+        def acquire_request() -> bool:
+            nonlocal num_requests
+            with lock:
+                if num_requests >= request_budget:
+                    return False
+                num_requests += 1
+                return True
+
+        def fetch_shard(shard: tuple[dt.datetime, dt.datetime]) -> tuple[list[News], bool]:
+            client = NewsClient(
+                api_key=os.getenv("ALPACA_API_KEY"), secret_key=os.getenv("ALPACA_API_SECRET")
+            )
+            page_token = None
+            news_list: list[News] = []
+            while True:
+                if not acquire_request():
+                    return news_list, False
+                request = NewsRequest(
+                    symbols=",".join(symbols),
+                    start=shard[0],
+                    end=shard[1],
+                    include_content=True,
+                    exclude_contentless=True,
+                    limit=BENZINGA_NEWS_LIMIT,
+                    page_token=page_token,
                 )
-                and len(news.symbols) <= MAX_NUM_SYMBOLS
-            ):
-                news_items.append(news)
+                news_set = client.get_news(request_params=request)
+                assert isinstance(news_set, NewsSet)
+                news_list.extend(news_set.data["news"])
 
-        for news in news_items:
-            if news.content is None or len(news.content) == 0:
-                continue
-            soup = BeautifulSoup(news.content, "html.parser")
+                page_token = news_set.next_page_token
+                if page_token is None or len(news_set.data["news"]) < BENZINGA_NEWS_LIMIT:
+                    return news_list, True
 
-            # Decompose all tables
-            for table in soup.find_all("table"):
-                table.decompose()
+        shards = get_date_shards(start, end, defaults["news_shard_days"])
+        news_by_id: dict[int, News] = {}
+        fetched_shards = []
+        with ThreadPoolExecutor(max_workers=defaults["news_max_workers"]) as executor:
+            for shard, (news_list, complete) in zip(
+                shards, executor.map(fetch_shard, shards), strict=True
+            ):
+                news_by_id.update((news.id, news) for news in news_list)
+                if complete:
+                    fetched_shards.append(shard)
+        if len(fetched_shards) < len(shards):
+            logger.warning(
+                f"Request budget of {request_budget} reached. Benzinga News for {symbols} is "
+                f"incomplete in {len(shards) - len(fetched_shards)} of {len(shards)} date shards"
+            )
+        logger.debug(f"Fetched {len(news_by_id)} articles for {symbols} in {num_requests} requests")
+
+        news_list = sorted(news_by_id.values(), key=lambda news: news.updated_at, reverse=True)
+        news_items = [news for news in news_list if news.content]
+        converted_contents = convert_benzinga_contents([news.content for news in news_items])
 
+        records = []
+        for news, (markdown_content, text) in zip(news_items, converted_contents, strict=True):
             record = dict(
                 title=news.headline,
                 published=news.updated_at,
@@ -123,25 +287,12 @@ class BenzingaNewsFetcher(NewsFetcherBase):
                 id=news.id,
                 summary=news.summary,
                 content=news.content,
-                markdown_content=convert_to_markdown(
-                    source=soup,
-                    autolinks=False,
-                    escape_misc=False,
-                    heading_style="atx",
-                    strip=["a", "table", "thead", "tbody", "td", "tr", "th", "img"],
-                    wrap=True,
-                    wrap_width=100,
-                ),
-                text=self.get_benzinga_content_text(news.content),
+                markdown_content=markdown_content,
+                text=text,
             )
             records.append(record)
 
-        if defaults["save_news_data"]:
-            with open(file_path, "wb") as file:
-                pickle.dump(records, file)
-                logger.info(f"Benzinga News data for '{ticker}' stored in '{file_path}'")
-
-        return records
+        return records, fetched_shards
 
     @staticmethod
     def get_benzinga_content_text(html_content: str, exclude_tables: bool = True) -> str:
@@ -160,31 +311,4 @@ class BenzingaNewsFetcher(NewsFetcherBase):
             for table in soup.find_all("table"):
                 table.decompose()
 
-        TAGS = ["p", "ul"]
-        filtered_text_list = []
-        for tag in soup.find_all(TAGS):
-            text = condense_newline(tag.text)
-            text = unicodedata.normalize("NFKD", text)  # Replace \xa0 with space
-            # text = re.sub(r"[\n\r]", "", text)  # Remove all newlines
-            text = re.sub(r"\t", " ", text)  # Replace all tab characters with space
-            text = re.sub(r"\s+", " ", text).strip()  # Condense whitespace
-
-            if len(text) == 0:
-                continue
-
-            text = re.sub(
-                r"\.\s*([A-Z])", r". \1", text
-            )  # Ensure that there is a space after period.
-            sentences = re.split(r"(?<=[.!?])\s+", text)
-            filtered_sentences = [
-                sentence
-                for sentence in sentences
-                if not any(
-                    ignore_word.lower() in sentence.lower() for ignore_word in SENTENCES_IGNORE_LIST
-                )
-            ]
-            if filtered_sentences and not filtered_sentences[-1].endswith("."):
-                filtered_sentences[-1] += "."
-            filtered_text_list.extend(filtered_sentences)
-
-        return " ".join(filtered_text_list)
+        return get_soup_text(soup)
@@ -0,0 +1,195 @@
+import datetime as dt
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+from finmas.constants import defaults
+from finmas.logger import get_logger
+
+logger = get_logger(__name__)
+
+ARTICLE_COLS = [
+    "id",
+    "title",
+    "published",
+    "author",
+    "num_symbols",
+    "symbols",
+    "link",
+    "summary",
+    "content",
+    "markdown_content",
+    "text",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    title TEXT,
+    published TEXT NOT NULL,
+    author TEXT,
+    num_symbols INTEGER,
+    symbols TEXT,
+    link TEXT,
+    summary TEXT,
+    content TEXT,
+    markdown_content TEXT,
+    text TEXT
+);
+CREATE TABLE IF NOT EXISTS article_symbols (
+    symbol TEXT NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES articles (id),
+    published TEXT NOT NULL,
+    PRIMARY KEY (symbol, article_id)
+);
+CREATE INDEX IF NOT EXISTS article_symbols_published ON article_symbols (symbol, published);
+CREATE TABLE IF NOT EXISTS coverage (
+    symbol TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_symbol ON coverage (symbol);
+"""
+
+
+def to_utc_str(timestamp: dt.datetime) -> str:
+    """Returns the timestamp as an ISO string in UTC. Naive timestamps are assumed to be in UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=dt.UTC)
+    return timestamp.astimezone(dt.UTC).isoformat()
+
+
+def connect() -> sqlite3.Connection:
+    """Connect to the news store and create the tables if they do not exist."""
+    store_path = Path(defaults["news_store_path"])
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(store_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def get_uncovered_ranges(
+    symbol: str, start: dt.datetime, end: dt.datetime
+) -> list[tuple[dt.datetime, dt.datetime]]:
+    """Returns the sub-ranges between start and end that have not been fetched for the symbol."""
+    with closing(connect()) as conn:
+        rows = conn.execute(
+            "SELECT start, end FROM coverage WHERE symbol = ? AND end > ? AND start < ? "
+            "ORDER BY start",
+            (symbol, to_utc_str(start), to_utc_str(end)),
+        ).fetchall()
+
+    uncovered = []
+    current = start if start.tzinfo else start.replace(tzinfo=dt.UTC)
+    end = end if end.tzinfo else end.replace(tzinfo=dt.UTC)
+    for row in rows:
+        covered_start = dt.datetime.fromisoformat(row["start"])
+        covered_end = dt.datetime.fromisoformat(row["end"])
+        if covered_start > current:
+            uncovered.append((current, covered_start))
+        current = max(current, covered_end)
+    if current < end:
+        uncovered.append((current, end))
+    return uncovered
+
+
+def add_coverage(symbol: str, start: dt.datetime, end: dt.datetime) -> None:
+    """Mark the range as fetched for the symbol, merging it with overlapping covered ranges."""
+    new_start, new_end = to_utc_str(start), to_utc_str(end)
+    with closing(connect()) as conn, conn:
+        rows = conn.execute(
+            "SELECT rowid, start, end FROM coverage WHERE symbol = ? AND end >= ? AND start <= ?",
+            (symbol, new_start, new_end),
+        ).fetchall()
+        for row in rows:
+            new_start = min(new_start, row["start"])
+            new_end = max(new_end, row["end"])
+            conn.execute("DELETE FROM coverage WHERE rowid = ?", (row["rowid"],))
+        conn.execute(
+            "INSERT INTO coverage (symbol, start, end) VALUES (?, ?, ?)",
+            (symbol, new_start, new_end),
+        )
+
+
+def store_articles(records: list[dict]) -> None:
+    """
+    Insert or update articles in the news store.
+
+    Each article is stored once and indexed under every symbol it is tagged with.
+    """
+    if not records:
+        return
+    placeholders = ", ".join("?" for _ in ARTICLE_COLS)
+    with closing(connect()) as conn, conn:
+        for record in records:
+            published = to_utc_str(record["published"])
+            values = dict(record, published=published, symbols=json.dumps(record["symbols"]))
+            conn.execute(
+                f"INSERT OR REPLACE INTO articles ({', '.join(ARTICLE_COLS)}) "
+                f"VALUES ({placeholders})",
+                [values[col] for col in ARTICLE_COLS],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO article_symbols (symbol, article_id, published) "
+                "VALUES (?, ?, ?)",
+                [(symbol, record["id"], published) for symbol in record["symbols"]],
+            )
+
+
+def read_articles(symbol: str, start: dt.datetime, end: dt.datetime) -> list[dict]:
+    """
+    Read the stored articles for a symbol that were published between start and end.
+
+    Returns:
+        List of article records sorted with the latest article first.
+    """
+    with closing(connect()) as conn:
+        rows = conn.execute(
+            f"SELECT {', '.join(f'a.{col}' for col in ARTICLE_COLS)} "
+            "FROM article_symbols s JOIN articles a ON a.id = s.article_id "
+            "WHERE s.symbol = ? AND s.published >= ? AND s.published <= ? "
+            "ORDER BY s.published DESC",
+            (symbol, to_utc_str(start), to_utc_str(end)),
+        ).fetchall()
+
+    records = []
+    for row in rows:
+        record = dict(row)
+        record["published"] = dt.datetime.fromisoformat(record["published"])
+        record["symbols"] = json.loads(record["symbols"])
+        records.append(record)
+    return records
+
+
+def read_article_contents(limit: int | None = None) -> list[dict]:
+    """Read the title and HTML content of the stored articles, with the latest article first."""
+    with closing(connect()) as conn:
+        rows = conn.execute(
+            "SELECT title, content FROM articles ORDER BY published DESC LIMIT ?",
+            (-1 if limit is None else limit,),
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def get_news_store_summary() -> list[dict]:
+    """Returns the number of stored articles and the covered date ranges for each symbol."""
+    with closing(connect()) as conn:
+        rows = conn.execute(
+            "SELECT c.symbol, MIN(c.start) AS start, MAX(c.end) AS end, "
+            "(SELECT COUNT(*) FROM article_symbols s WHERE s.symbol = c.symbol) AS num_articles "
+            "FROM coverage c GROUP BY c.symbol ORDER BY c.symbol"
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def delete_symbol(symbol: str) -> None:
+    """Delete the coverage and the articles of a symbol that are not tagged with another symbol."""
+    with closing(connect()) as conn, conn:
+        conn.execute("DELETE FROM coverage WHERE symbol = ?", (symbol,))
+        conn.execute("DELETE FROM article_symbols WHERE symbol = ?", (symbol,))
+        conn.execute(
+            "DELETE FROM articles WHERE id NOT IN (SELECT article_id FROM article_symbols)"
+        )
@@ -4,7 +4,8 @@ from finmas.constants import defaults
 from finmas.crews.model_provider import get_embedding_model, get_llama_index_llm
 from finmas.crews.utils import IndexCreationMetrics
 from finmas.data.news.news_fetcher import parse_news_to_documents
-from finmas.data.token_counting import token_counter
+from finmas.data.token_counting import get_embedding_token_count
+from finmas.data.vector_store import load_or_create_vector_store_index
 from finmas.logger import get_logger
 from finmas.utils.common import get_text_content_file, get_vector_store_index_dir
 
@@ -32,14 +33,20 @@ def get_news_query_engine(
 
     embed_model = get_embedding_model(llm_provider, embedding_model)
 
-    from llama_index.core import Settings, VectorStoreIndex
+    from llama_index.core import Settings
 
     start = time.time()
-    token_counter.reset_counts()
-    index = VectorStoreIndex.from_documents(documents, embed_model=embed_model)
-    index.storage_context.persist(persist_dir=get_vector_store_index_dir(ticker, "news"))
+    index, loaded_from_storage = load_or_create_vector_store_index(
+        documents,
+        embed_model=embed_model,
+        embedding_model=embedding_model,
+        persist_dir=get_vector_store_index_dir(ticker, "news"),
+    )
     time_spent = round(time.time() - start, 2)
-    logger.info(f"News index created in {time_spent}s with {len(documents)} documents")
+    logger.info(
+        f"News index {'loaded' if loaded_from_storage else 'created'} in {time_spent}s "
+        f"with {len(documents)} documents"
+    )
 
     text_length = sum([len(doc.text) for doc in documents])
 
@@ -50,7 +57,12 @@ def get_news_query_engine(
         text_length=text_length,
         chunk_size=Settings.chunk_size,
         chunk_overlap=Settings.chunk_overlap,
-        total_embedding_token_count=token_counter.total_embedding_token_count,
+        total_embedding_token_count=(
+            0 if loaded_from_storage else get_embedding_token_count(index, embed_model)
+        ),
+        loaded_from_storage=loaded_from_storage,
+        embedding_cache_hits=getattr(embed_model, "cache_hits", 0),
+        embedding_cache_misses=getattr(embed_model, "cache_misses", 0),
     )
 
     llama_index_llm = get_llama_index_llm(
@@ -0,0 +1,115 @@
+import re
+import unicodedata
+
+NEWS_TEXT_CLEANERS = ["legacy", "compiled"]
+
+# Patterns applied to text where the whitespace is condensed to single spaces
+PERIOD_PATTERN = re.compile(r"\.(?=[A-Z])")  # Period without a space before a new sentence
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?]) ")
+
+
+def compile_ignore_pattern(ignore_list: list[str]) -> re.Pattern:
+    """
+    Compile the phrases of an ignore list into one regex that matches any of the phrases.
+
+    The phrases are lowercased, and the regex is matched against lowercased text.
+    This is much faster than a case-insensitive regex in the re module.
+    """
+    if not ignore_list:
+        return re.compile(r"(?!)")  # Never matches
+    return re.compile("|".join(re.escape(phrase.lower()) for phrase in ignore_list))
+
+
+def condense_newline(text):
+    """Helper to reduce consecutive newlines into single newline."""
+    return "\n".join([p for p in re.split("\n|\r", text) if len(p) > 0])
+
+
+class NewsTextCleaner:
+    """
+    Cleans the text of news articles and filters out sentences and headlines with ignore lists.
+
+    The 'legacy' cleaner lowercases each sentence and loops over the ignore list, and runs
+    several regex passes over each paragraph. The 'compiled' cleaner matches an ignore list
+    with one compiled regex, and normalizes unicode and whitespace in a single pass.
+    Both cleaners produce the same text.
+    """
+
+    def __init__(
+        self,
+        sentences_ignore_list: list[str],
+        headline_ignore_list: list[str],
+        cleaner: str = "compiled",
+    ) -> None:
+        """Initialize the NewsTextCleaner class."""
+        if cleaner not in NEWS_TEXT_CLEANERS:
+            raise ValueError(
+                f"Unknown news text cleaner '{cleaner}'. Choose from {NEWS_TEXT_CLEANERS}"
+            )
+        self.sentences_ignore_list = sentences_ignore_list
+        self.headline_ignore_list = headline_ignore_list
+        self.cleaner = cleaner
+        self.sentences_ignore_pattern = compile_ignore_pattern(sentences_ignore_list)
+        self.headline_ignore_pattern = compile_ignore_pattern(headline_ignore_list)
+
+    def is_ignored_headline(self, headline: str) -> bool:
+        """Returns True if the headline contains a phrase from the headline ignore list."""
+        if self.cleaner == "legacy":
+            return any(
+                ignore_headline.lower() in headline.lower()
+                for ignore_headline in self.headline_ignore_list
+            )
+        return self.headline_ignore_pattern.search(headline.lower()) is not None
+
+    def get_sentences(self, text: str) -> list[str]:
+        """
+        Returns the clean sentences of a paragraph of a news article.
+
+        Sentences that contain a phrase from the sentences ignore list are removed,
+        and the last sentence ends with a period.
+        """
+        if self.cleaner == "legacy":
+            sentences = self._get_sentences_legacy(text)
+        else:
+            sentences = self._get_sentences_compiled(text)
+
+        if sentences and not sentences[-1].endswith("."):
+            sentences[-1] += "."
+        return sentences
+
+    def _get_sentences_legacy(self, text: str) -> list[str]:
+        text = condense_newline(text)
+        text = unicodedata.normalize("NFKD", text)  # Replace \xa0 with space
+        text = re.sub(r"\t", " ", text)  # Replace all tab characters with space
+        text = re.sub(r"\s+", " ", text).strip()  # Condense whitespace
+
+        if len(text) == 0:
+            return []
+
+        text = re.sub(r"\.\s*([A-Z])", r". \1", text)  # Ensure that there is a space after period.
+        sentences = re.split(r"(?<=[.!?])\s+", text)
+        return [
+            sentence
+            for sentence in sentences
+            if not any(
+                ignore_word.lower() in sentence.lower()
+                for ignore_word in self.sentences_ignore_list
+            )
+        ]
+
+    def _get_sentences_compiled(self, text: str) -> list[str]:
+        # Splitting on whitespace condenses newlines, tabs and the spaces from the normalization
+        text = " ".join(unicodedata.normalize("NFKD", text).split())
+        if not text:
+            return []
+
+        text = PERIOD_PATTERN.sub(". ", text)
+        sentences = SENTENCE_SPLIT_PATTERN.split(text)
+        # Most paragraphs contain no ignored phrase, so the paragraph is searched once first
+        if self.sentences_ignore_pattern.search(text.lower()) is None:
+            return sentences
+        return [
+            sentence
+            for sentence in sentences
+            if self.sentences_ignore_pattern.search(sentence.lower()) is None
+        ]
@@ -1,31 +1,59 @@
+import asyncio
 import datetime as dt
+import gzip
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
 
 import pandas as pd
-from edgar import Company, set_identity
+import requests
+from edgar import Company, Filing, set_identity
 from edgar.entity.filings import EntityFilings
+from requests.adapters import HTTPAdapter
 
 from finmas.cache_config import cache
-from finmas.constants import SEC_FILINGS_COLS, defaults
+from finmas.constants import SEC_FILINGS_COLS, SEC_IDENTITY, defaults
+from finmas.logger import get_logger
+from finmas.utils.rate_limiter import SlidingWindowRateLimiter
 
-set_identity("John Doe john.doe@example.com")
+set_identity(SEC_IDENTITY)
+
+logger = get_logger(__name__)
+
+SEC_ARCHIVES_URL = "https://www.sec.gov/Archives/edgar/data"
+
+# Retries of throttled and failed document downloads, each waiting for the rate limiter
+SEC_MAX_RETRIES = 3
+SEC_RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+
+@cache.memoize(expire=dt.timedelta(hours=defaults["sec_filings_cache_ttl_hours"]).total_seconds())
+def get_company_filings(ticker: str) -> EntityFilings:
+    """
+    Use edgartools to get the full filing history of a company.
+
+    The filing history is cached with the TTL `sec_filings_cache_ttl_hours`,
+    since it only changes when the company files a new filing.
+    """
+    return Company(ticker).get_filings()
 
 
-@cache.memoize(expire=dt.timedelta(days=1).total_seconds())
 def get_sec_filings(ticker: str, filing_types: list[str], latest: int = 10) -> EntityFilings:
-    """Use edgartools to get the latest SEC filings."""
-    return Company(ticker).get_filings(form=filing_types).latest(latest)
+    """Get the latest SEC filings of the given types, derived from the cached filing history."""
+    return get_company_filings(ticker).filter(form=filing_types, amendments=True).latest(latest)
 
 
 def filings_to_df(filings: EntityFilings) -> pd.DataFrame:
     """
     Convert filings to a DataFrame.
 
-    Adds a column with the URL.
+    Adds a column with the URL of the primary document from the filing metadata.
     Converts dates to strings.
     """
     df = filings.to_pandas()
-    df["link"] = [f.document.url for f in filings]
+    df["link"] = [get_filing_document_url(f) for f in filings]
     df = df[SEC_FILINGS_COLS]
     for col in ["filing_date", "reportDate"]:
         df[col] = pd.to_datetime(df[col]).dt.strftime("%Y-%m-%d")
@@ -48,3 +76,260 @@ def download_filings(filings: EntityFilings) -> None:
         output_file = filing_dir / filing.document.document
         if not output_file.exists():
             filing.document.download(path=filing_dir)
+
+
+def get_filing_text_path(ticker: str, filing: Filing, compressed: bool = False) -> Path:
+    """
+    Returns the path of the cached text content of the filing.
+
+    The file is keyed by the accession number, which uniquely identifies the filing.
+    """
+    suffix = ".md.gz" if compressed else ".md"
+    return Path(defaults["filings_dir"]) / ticker / filing.form / f"{filing.accession_no}{suffix}"
+
+
+def get_stored_filing_text_path(ticker: str, filing: Filing) -> Path | None:
+    """Returns the path of the stored text content of the filing, plain or compressed."""
+    for compressed in [False, True]:
+        text_path = get_filing_text_path(ticker, filing, compressed=compressed)
+        if text_path.exists():
+            return text_path
+    return None
+
+
+def get_filing_text(ticker: str, filing: Filing, force: bool = False) -> str:
+    """
+    Returns the text content of the SEC filing as Markdown.
+
+    Filings are immutable once published, so the Markdown conversion from edgartools is
+    stored by accession number and read from disk on later calls. The conversion is stored
+    with gzip compression if `filing_text_compression` is enabled in the config.
+    Both the plain and compressed variants are read when present.
+
+    Args:
+        ticker: Ticker for company
+        filing: The SEC filing object
+        force: Convert the filing again and overwrite the stored text,
+            e.g. after an upgrade of the parser.
+    """
+    stored_text_path = get_stored_filing_text_path(ticker, filing)
+    if not force and stored_text_path is not None:
+        logger.info(f"Loaded text content of SEC filing from '{stored_text_path}'")
+        if stored_text_path.suffix == ".gz":
+            with gzip.open(stored_text_path, "rt", encoding="utf-8") as f:
+                return f.read()
+        return stored_text_path.read_text(encoding="utf-8")
+
+    start = time.time()
+    text_content = filing.text()
+
+    compressed = defaults["filing_text_compression"]
+    text_path = get_filing_text_path(ticker, filing, compressed=compressed)
+    text_path.parent.mkdir(parents=True, exist_ok=True)
+    # Remove a stored variant with the other compression setting, so that it is not read later
+    get_filing_text_path(ticker, filing, compressed=not compressed).unlink(missing_ok=True)
+    if compressed:
+        with gzip.open(text_path, "wt", encoding="utf-8") as f:
+            f.write(text_content)
+    else:
+        text_path.write_text(text_content, encoding="utf-8")
+    logger.info(
+        f"Text content of SEC filing stored at '{text_path}' in {time.time() - start:.1f} seconds"
+    )
+
+    return text_content
+
+
+def get_primary_document_name(filing: Filing) -> str:
+    """
+    Returns the file name of the primary document of the filing.
+
+    Filings from the filing history of a company carry the name in the filing metadata, so no
+    request to EDGAR is needed. Other filings fall back to the filing index from EDGAR.
+    """
+    primary_document = getattr(filing, "primary_document", None)
+    return primary_document or filing.document.document
+
+
+def get_filing_document_url(filing: Filing) -> str:
+    """Returns the URL of the primary document of the filing from the filing metadata."""
+    accession_number = filing.accession_no.replace("-", "")
+    return f"{SEC_ARCHIVES_URL}/{filing.cik}/{accession_number}/{get_primary_document_name(filing)}"
+
+
+class EdgarRateLimiter:
+    """
+    Adapter that lets the HTTP client of edgartools wait for a SlidingWindowRateLimiter.
+
+    edgartools throttles its requests with its own limiter. Replacing that limiter makes the
+    requests of edgartools and the document downloads share one budget of requests to SEC.
+    Only requests that are sent to SEC wait for the limiter, as responses from the edgartools
+    HTTP cache are served before the limiter.
+    """
+
+    def __init__(self, rate_limiter: SlidingWindowRateLimiter) -> None:
+        """Initialize the EdgarRateLimiter class."""
+        self.rate_limiter = rate_limiter
+
+    def try_acquire(self, name: str) -> bool:
+        """Wait for a request slot. The name is ignored, as all requests share the limit."""
+        self.rate_limiter.acquire()
+        return True
+
+    async def try_acquire_async(self, name: str) -> bool:
+        """Wait for a request slot without blocking the event loop."""
+        await asyncio.to_thread(self.rate_limiter.acquire)
+        return True
+
+
+@contextmanager
+def edgar_rate_limiter(rate_limiter: SlidingWindowRateLimiter) -> Iterator[None]:
+    """Route the HTTP requests of edgartools through the rate limiter within the context."""
+    import edgar.httpclient
+
+    http_mgr = edgar.httpclient.HTTP_MGR
+    previous_rate_limiter = http_mgr.rate_limiter
+    # The HTTP client is closed, so that it is created again with the new limiter
+    http_mgr.rate_limiter = EdgarRateLimiter(rate_limiter)
+    http_mgr.close()
+    try:
+        yield
+    finally:
+        http_mgr.rate_limiter = previous_rate_limiter
+        http_mgr.close()
+
+
+def get_sec_session(pool_size: int) -> requests.Session:
+    """
+    Returns an HTTP session for requests to SEC EDGAR.
+
+    The connections are pooled and shared between the threads using the session.
+    The session does not retry requests, so that every retry goes through the rate limiter,
+    see download_filing_document.
+    """
+    session = requests.Session()
+    session.headers.update({"User-Agent": SEC_IDENTITY, "Accept-Encoding": "gzip, deflate"})
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    return session
+
+
+def download_filing_document(
+    filing: Filing,
+    filing_dir: Path,
+    session: requests.Session,
+    rate_limiter: SlidingWindowRateLimiter,
+) -> bool:
+    """
+    Download the primary document of the filing, unless it is already stored.
+
+    Throttled and failed requests are retried with exponential backoff, respecting the
+    Retry-After header sent by SEC, and each attempt waits for the rate limiter.
+    When SEC throttles a request, the rate limiter is paused, so that all workers back off.
+    The document is first written to a temporary .part file and then renamed,
+    so that an interrupted download is never mistaken for a stored document.
+
+    Returns:
+        True if the document was downloaded, False if it was already stored.
+    """
+    output_file = filing_dir / get_primary_document_name(filing)
+    if output_file.exists():
+        return False
+
+    url = get_filing_document_url(filing)
+    for attempt in range(SEC_MAX_RETRIES + 1):
+        rate_limiter.acquire()
+        try:
+            response = session.get(url, timeout=60)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == SEC_MAX_RETRIES:
+                raise
+            time.sleep(2**attempt)
+            continue
+        if response.status_code not in SEC_RETRY_STATUS_CODES or attempt == SEC_MAX_RETRIES:
+            break
+        retry_after = response.headers.get("Retry-After", "")
+        wait = float(retry_after) if retry_after.isdigit() else 2**attempt
+        if response.status_code == 429:
+            rate_limiter.pause(wait)
+        else:
+            time.sleep(wait)
+    response.raise_for_status()
+
+    filing_dir.mkdir(parents=True, exist_ok=True)
+    part_file = output_file.with_name(output_file.name + ".part")
+    part_file.write_bytes(response.content)
+    part_file.replace(output_file)
+    return True
+
+
+def prefetch_filings(
+    tickers: list[str],
+    filing_types: list[str] | None = None,
+    latest: int = 4,
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """
+    Download the latest SEC filings for a list of tickers concurrently.
+
+    All requests to SEC EDGAR share a sliding window rate limiter, so that at most
+    `sec_max_requests_per_second` requests are sent in any second (SEC allows at most
+    10 requests per second). This includes
+    every request edgartools sends to list the filings of a ticker, and every retry.
+    Documents that are already stored are skipped, so an interrupted prefetch resumes
+    where it stopped when it is run again.
+
+    Args:
+        tickers: List of tickers
+        filing_types: Filing types to download. Defaults to `sec_filing_types` in the config.
+        latest: Number of latest filings to download per ticker
+        max_workers: Number of concurrent downloads. Defaults to `sec_prefetch_max_workers`.
+
+    Returns:
+        DataFrame with the number of downloaded, skipped and failed filings per ticker.
+    """
+    filing_types = filing_types or defaults["sec_filing_types"]
+    max_workers = max_workers or defaults["sec_prefetch_max_workers"]
+    filings_base_dir = Path(defaults["filings_dir"])
+    rate_limiter = SlidingWindowRateLimiter(
+        max_requests=defaults["sec_max_requests_per_second"], window=1
+    )
+    session = get_sec_session(pool_size=max_workers)
+
+    records = {ticker: dict(downloaded=0, skipped=0, failed=0) for ticker in tickers}
+    start = time.time()
+    with (
+        edgar_rate_limiter(rate_limiter),
+        ThreadPoolExecutor(max_workers=max_workers) as executor,
+    ):
+        listing_futures = {
+            executor.submit(get_sec_filings, ticker, filing_types, latest): ticker
+            for ticker in tickers
+        }
+        download_futures = {}
+        for listing_future in as_completed(listing_futures):
+            ticker = listing_futures[listing_future]
+            try:
+                filings = listing_future.result()
+            except Exception as e:
+                logger.warning(f"Could not list SEC filings for '{ticker}': {e}")
+                records[ticker]["failed"] += 1
+                continue
+            for filing in filings or []:
+                filing_dir = filings_base_dir / ticker / filing.form
+                download_future = executor.submit(
+                    download_filing_document, filing, filing_dir, session, rate_limiter
+                )
+                download_futures[download_future] = (ticker, filing)
+
+        for download_future in as_completed(download_futures):
+            ticker, filing = download_futures[download_future]
+            try:
+                records[ticker]["downloaded" if download_future.result() else "skipped"] += 1
+            except Exception as e:
+                logger.warning(f"Could not download SEC filing {filing.accession_no}: {e}")
+                records[ticker]["failed"] += 1
+
+    session.close()
+    logger.info(f"Prefetched SEC filings for {len(tickers)} tickers in {time.time() - start:.1f} s")
+    return pd.DataFrame.from_dict(records, orient="index").rename_axis("ticker")
@@ -5,15 +5,22 @@ from typing import Any
 
 from edgar import Filing, set_identity
 
-from finmas.constants import defaults
+from finmas.constants import SEC_IDENTITY, defaults
 from finmas.crews.model_provider import get_embedding_model, get_llama_index_llm
 from finmas.crews.utils import IndexCreationMetrics
-from finmas.data.sec.sec_parser import SECTION_FILENAME_MAP, SECFilingParser
-from finmas.data.token_counting import token_counter
+from finmas.data.sec.filings import get_filing_text, get_primary_document_name
+from finmas.data.sec.sec_parser import (
+    SECTION_FILENAME_MAP,
+    FilingSegmentation,
+    SECFilingParser,
+    get_section_index_path,
+)
+from finmas.data.token_counting import get_embedding_token_count
+from finmas.data.vector_store import load_or_create_vector_store_index
 from finmas.logger import get_logger
 from finmas.utils.common import get_text_content_file, get_vector_store_index_dir
 
-set_identity("John Doe john.doe@example.com")
+set_identity(SEC_IDENTITY)
 
 logger = get_logger(__name__)
 
@@ -24,49 +31,53 @@ SUPPORTED_METHODS = [
 ]
 
 
-def get_sec_filing_as_text_content(ticker: str, filing: Filing) -> str:
+def get_sec_filing_as_text_content(ticker: str, filing: Filing, force: bool = False) -> str:
     """
     Fetch the SEC filing as text content.
 
-    Either from accession number or the latest filing among the filing types specified.
-
-    The following methodology is used:
-    1. If accession number is not given, then fetch the latest filing according to filing_types.
-    2. Parse the HTML content into JSON according to datamule package.
-    3. Convert the JSON content to HTML using datamule package.
-    4. Convert the HTML content to text using html2text package.
-    5. Store the text content as Markdown for inspection by the user.
+    The text content is the Markdown conversion of the filing from edgartools, which is
+    stored by accession number in the filings directory and only converted on a cache miss.
+    See get_filing_text for details.
 
     Args:
         ticker: Ticker for company
         filing: The SEC filing object for parsing.
+        force: Convert the filing again even if the text content is already stored.
     """
-    filing_type = filing.form
-    filings_dir = Path(defaults["filings_dir"]) / ticker / filing_type
-    filings_dir.mkdir(parents=True, exist_ok=True)
+    return get_filing_text(ticker=ticker, filing=filing, force=force)
 
-    filename = filing.document.document
-    output_file = filings_dir / filename
-    if not output_file.exists():
-        filing.document.download(path=filings_dir)
 
-    # filing_url = filing.document.url
-
-    # json_content = parse_textual_filing(filing_url, return_type="json")
-    # html_content = json_to_html(json_content)
+def get_filing_segmentation(ticker: str, filing: Filing) -> FilingSegmentation:
+    """
+    Returns the segmentation of the SEC filing into its Item sections.
 
-    # h = html2text.HTML2Text()
-    # h.ignore_links = False
-    # h.ignore_tables = False
+    Filings are immutable once published, so the section index persisted next to the filing
+    is used when it exists. Otherwise the filing is cleaned and segmented with SECFilingParser,
+    which persists the section index for later runs.
 
-    # text_content = h.handle(html_content)
-    text_content = filing.text()
-    output_file.with_suffix(".md").write_text(text_content, encoding="utf-8")
+    Args:
+        ticker: Ticker for company
+        filing: The SEC filing object for parsing.
+    """
+    filing_html_path = (
+        Path(defaults["filings_dir"]) / ticker / filing.form / get_primary_document_name(filing)
+    )
+    segmentation = FilingSegmentation.load(get_section_index_path(filing_html_path))
+    if segmentation is not None:
+        logger.info(f"Loaded section index for SEC filing '{filing_html_path}'")
+        return segmentation
 
-    return text_content
+    parser = SECFilingParser(ticker=ticker, form_type=filing.form)
+    parser.parse_filing_as_html(filing)
+    return parser.segment_filing()
 
 
-def _get_sec_text_content(ticker: str, filing: Filing, method: str) -> str:
+def _get_sec_text_content(
+    ticker: str,
+    filing: Filing,
+    method: str,
+    segmentation: FilingSegmentation | None = None,
+) -> str:
     """
     Handler function to get the text content of the SEC filing based on the method specified.
 
@@ -77,17 +88,13 @@ def _get_sec_text_content(ticker: str, filing: Filing, method: str) -> str:
     See get_sec_query_engine for description of arguments.
     """
     if method.startswith("section"):
-        parser = SECFilingParser(ticker=ticker, form_type=filing.form)
-        parser.parse_filing_as_html(filing)
-        toc = parser.extract_table_of_contents_from_html()
-
-        section_abbr = method.split(":")[1]
-        section_name = SECTION_FILENAME_MAP[section_abbr]
-        for i, heading in enumerate(toc[:-1]):
-            if section_name in heading:
-                next_heading = toc[i + 1]
-                text_content = parser.extract_section_from_html(heading, next_heading)
-                break
+        if segmentation is None:
+            segmentation = get_filing_segmentation(ticker=ticker, filing=filing)
+        section_name = SECTION_FILENAME_MAP[method.split(":")[1]]
+        section = segmentation.find_section(section_name)
+        if section is None:
+            raise ValueError(f"Could not find the section '{section_name}' in the filing")
+        text_content = section.text
     else:
         text_content = get_sec_filing_as_text_content(ticker=ticker, filing=filing)
 
@@ -115,6 +122,7 @@ def get_sec_query_engine(
     temperature: float | None = None,
     max_tokens: int | None = None,
     similarity_top_k: int | None = None,
+    segmentation: FilingSegmentation | None = None,
 ) -> tuple[Any, IndexCreationMetrics]:
     """
     Create a llama-index query engine that uses a Vector Store Index.
@@ -139,13 +147,17 @@ def get_sec_query_engine(
         temperature: Temperature for the LLM
         max_tokens: Maximum number of tokens for the LLM
         similarity_top_k: Number of top-k similar documents to return
+        segmentation: Optional segmentation of the filing from get_filing_segmentation.
+            Used to share a single parsed filing between several section indexes.
     """
     if method not in SUPPORTED_METHODS:
         raise ValueError(
             f"Method {method} is not supported. Supported methods are: {SUPPORTED_METHODS}"
         )
 
-    text_content = _get_sec_text_content(ticker=ticker, filing=filing, method=method)
+    text_content = _get_sec_text_content(
+        ticker=ticker, filing=filing, method=method, segmentation=segmentation
+    )
     if defaults["save_text_content"]:
         file_path = get_text_content_file(
             ticker=ticker, data_type="sec", suffix=method.replace(":", "_")
@@ -161,15 +173,16 @@ def get_sec_query_engine(
 
     embed_model = get_embedding_model(llm_provider, embedding_model)
 
-    from llama_index.core import Settings, VectorStoreIndex
+    from llama_index.core import Settings
 
     start = time.time()
-    token_counter.reset_counts()
-    index = VectorStoreIndex.from_documents([document], embed_model=embed_model)
-    index.storage_context.persist(
+    index, loaded_from_storage = load_or_create_vector_store_index(
+        [document],
+        embed_model=embed_model,
+        embedding_model=embedding_model,
         persist_dir=get_vector_store_index_dir(
             ticker=ticker, data_type="sec", subfolder=method.replace(":", "_")
-        )
+        ),
     )
 
     metrics = IndexCreationMetrics(
@@ -179,11 +192,17 @@ def get_sec_query_engine(
         text_length=len(text_content),
         chunk_size=Settings.chunk_size,
         chunk_overlap=Settings.chunk_overlap,
-        total_embedding_token_count=token_counter.total_embedding_token_count,
+        total_embedding_token_count=(
+            0 if loaded_from_storage else get_embedding_token_count(index, embed_model)
+        ),
+        loaded_from_storage=loaded_from_storage,
+        embedding_cache_hits=getattr(embed_model, "cache_hits", 0),
+        embedding_cache_misses=getattr(embed_model, "cache_misses", 0),
     )
 
     logger.info(
-        f"Created Vector Store Index for SEC filing with {len(index.index_struct.nodes_dict.keys())} nodes"
+        f"{'Loaded' if loaded_from_storage else 'Created'} Vector Store Index for SEC filing "
+        f"with {len(index.index_struct.nodes_dict.keys())} nodes"
     )
 
     llama_index_llm = get_llama_index_llm(
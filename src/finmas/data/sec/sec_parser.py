@@ -1,15 +1,25 @@
+import json
 import logging
 import re
+import threading
 import time
 import unicodedata
+from collections.abc import Iterator
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 from bs4 import BeautifulSoup, Tag
 from edgar import Company, Filing, find, set_identity
 
-from finmas.constants import defaults
+from finmas.constants import SEC_IDENTITY, defaults
+from finmas.data.sec.filings import (
+    get_filing_text,
+    get_primary_document_name,
+    get_stored_filing_text_path,
+)
 
-set_identity("John Doe john.doe@example.com")
+set_identity(SEC_IDENTITY)
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +28,15 @@ SECTION_FILENAME_MAP = {
     "risk_factors": "Risk Factors",
 }
 
+# Headings such as 'Item 1A. Risk Factors', 'ITEM 7:' or 'Item 2 - Properties'
+ITEM_HEADING_PATTERN = re.compile(r"^(?i:item)\s*(\d{1,2}[A-Za-z]?)\s*(?:[.:\-]|$)")
+# Headings such as 'PART II' or 'Part I. Financial Information'
+PART_HEADING_PATTERN = re.compile(r"^(?i:part)\s+(IV|I{1,3}|iv|i{1,3})\b")
+MAX_HEADING_LENGTH = 300
+
+# Increment when the segmentation changes, so that persisted section indexes are rebuilt
+SECTION_INDEX_VERSION = 1
+
 
 class SECFilingParser:
     """
@@ -43,6 +62,9 @@ class SECFilingParser:
         self.form_type = form_type
         self.filing_path = Path(defaults["filings_dir"]) / self.ticker / form_type
         self.filing_path.mkdir(parents=True, exist_ok=True)
+        self._soup: BeautifulSoup | None = None
+        self._segmentation: FilingSegmentation | None = None
+        self._lock = threading.Lock()
         if clean:
             for file in self.filing_path.glob("*"):
                 file.unlink()
@@ -74,51 +96,24 @@ class SECFilingParser:
 
     def parse_filing_as_html(self, filing: Filing) -> None:
         """Parse filing as HTML and clean the HTML content."""
-        self.filing_html_path = self.filing_path / filing.document.document
+        self.filing_html_path = self.filing_path / get_primary_document_name(filing)
         if not self.filing_html_path.exists():
             filing.document.download(path=self.filing_html_path)
         self._clean_html_filing()
 
     def parse_filing_as_markdown(self, filing: Filing) -> None:
         """
-        Parse filing as Markdown using the datamule endpoint.
+        Parse filing as Markdown using the edgartools conversion.
 
-        This method strips the HTML content of any tables and inline XBRL tags before converting it to Markdown.
-
-        Methodology:
-            1. parse_textual_filing function from datamule is used to parse the filing as JSON.
-            2. json_to_html function from datamule is used to convert the JSON content to HTML.
-            3. html2text is used to convert the HTML content to plain text.
+        The Markdown is stored once per filing by accession number, see get_filing_text,
+        so no separate copy is written for the parser.
 
         Args:
             filing: edgar.Filing object to parse
         """
-        self.filing_markdown_path = (self.filing_path / filing.document.document).with_suffix(".md")
-        if self.filing_markdown_path.exists():
-            logger.info(f"SEC Filing already stored as Markdown at: {self.filing_markdown_path}")
-            return
-
-        start = time.time()
-        # json_content = parse_textual_filing(filing.document.url, return_type="json")
-        # html_content = json_to_html(json_content)
-
-        # h = html2text.HTML2Text()
-        # h.ignore_links = True
-        # h.ignore_images = True
-        # h.ignore_emphasis = True
-
-        # text_content = h.handle(html_content)
-        text_content = filing.text()
-
-        # The text content from the HTML conversion includes headers
-        # so we remove the leading '#' characters to avoid unnecessary headers
-        text_content = re.sub(r"^\s*#+\s*", "", text_content, flags=re.MULTILINE)
-        text_content = re.sub(r"\u2022\s?", "- ", text_content)
-
-        self.filing_markdown_path.write_text(text_content, encoding="utf-8")
-
+        get_filing_text(ticker=self.ticker, filing=filing)
+        self.filing_markdown_path = get_stored_filing_text_path(self.ticker, filing)
         logger.info(f"SEC Filing stored as Markdown at: {self.filing_markdown_path}")
-        logger.info(f"Time spent to parse and download filing: {time.time() - start:.1f} seconds")
 
     def _clean_html_filing(self) -> None:
         """
@@ -136,67 +131,34 @@ class SECFilingParser:
         5. The first page of the filing is removed by removing all tags before the TABLE OF CONTENTS or INDEX.
         6. Empty div tags with an id attribute are removed.
         7. Horizontal line tags <hr> are removed along with the tags before and after them.
-        8. A collection of regex substitutions are performed to clean up the HTML content.
+        8. A collection of substitutions are performed to clean up the HTML content.
+
+        The cleaner backend is selected with the `sec_html_cleaner` setting, see clean_filing_html.
         """
         start = time.time()
         with open(self.filing_html_path, encoding="utf-8") as f:
             html_content = f.read()
-        html_content = unicodedata.normalize("NFKD", html_content)  # Normalize unicode characters
-
-        soup = BeautifulSoup(html_content, "html.parser")
-
-        # ix: tags represent inline XBRL tags, which we can remove
-        for tag in soup.find_all(re.compile(r"^(ix|xbrli):")):
-            tag.unwrap()
-
-        for tag in soup.find_all(True):
-            del tag["style"]
-
-        # Find the tag that represents the heading for the table of contents
-        toc_div = soup.find(
-            lambda tag: tag.name in ["div", "p", "span"]
-            and tag.text.strip() in ["TABLE OF CONTENTS", "INDEX", "Table of Contents"]
-            and not tag.find("a")
-        )
-
-        if toc_div:
-            # Remove all tags before the previous <hr> tag as they represent the first page
-            hr_tag = toc_div.find_previous("hr")
-            for sibling in hr_tag.find_previous_siblings(True):
-                sibling.decompose()
-
-        for tag in soup.find_all("span"):
-            tag.unwrap()
-        # Remove any div tags that are empty and have an id attribute
-        for div_tag in soup.find_all("div", id=True):
-            if not div_tag.text.strip():
-                div_tag.decompose()
-
-        # Remove all hr (horizontal line) tags and the single tag before and after it
-        for hr_tag in soup.find_all("hr"):
-            prev_tag = hr_tag.find_previous_sibling()
-            if prev_tag:
-                prev_tag.decompose()
-            next_tag = hr_tag.find_next_sibling()
-            if next_tag:
-                next_tag.decompose()
-            hr_tag.decompose()
-
-        cleaned_html = str(soup)
-        # Perform a collection of regex substitutions to clean up the HTML
-        cleaned_html = re.sub(r"\n{3,}", "\n\n", cleaned_html)  # Remove extra newlines
-
-        cleaned_html = re.sub(r"[\u00a0\xa0]", " ", cleaned_html)  # Non-breaking space
-        cleaned_html = re.sub(r"\u2022\s?", "- ", cleaned_html)  # Bullet point
-        cleaned_html = re.sub(r"[\u2018\u2019]", "'", cleaned_html)  # Left and right single quotes
-        cleaned_html = re.sub(r"[\u201C\u201D]", '"', cleaned_html)  # Left and right double quotes
-        cleaned_html = re.sub(r"[\u2013\u2014]", "-", cleaned_html)  # En dash and em dash
+        cleaned_html = clean_filing_html(html_content, cleaner=defaults["sec_html_cleaner"])
 
         self.filing_cleaned_html_path = self.filing_html_path.with_suffix(".refined.html")
         self.filing_cleaned_html_path.write_text(cleaned_html, encoding="utf-8")
+        self._soup = None
+        self._segmentation = None
 
         logger.info(f"Refined HTML stored at: {self.filing_html_path}")
-        logger.info(f"Time spent to clean HTML filing: {time.time() - start:.1f} seconds")
+        logger.info(
+            f"Time spent to clean HTML filing ({defaults['sec_html_cleaner']}): "
+            f"{time.time() - start:.1f} seconds"
+        )
+
+    def _get_soup(self) -> BeautifulSoup:
+        """Returns the parsed cleaned HTML content. The HTML is only parsed once per parser."""
+        if getattr(self, "filing_cleaned_html_path", None) is None:
+            raise ValueError("Must download filing before parsing the cleaned HTML")
+        if self._soup is None:
+            html_content = self.filing_cleaned_html_path.read_text(encoding="utf-8")
+            self._soup = BeautifulSoup(html_content, "html.parser")
+        return self._soup
 
     def extract_table_of_contents_from_html(self) -> list[str]:
         """
@@ -205,89 +167,389 @@ class SECFilingParser:
         This method searches for the first table tag in the cleaned HTML content,
         and returns a list of strings representing the headings.
         """
-        if self.filing_html_path is None or not self.filing_cleaned_html_path.exists():
-            raise ValueError("Must download filing before extracting table of contents")
-
-        html_content = self.filing_cleaned_html_path.read_text(encoding="utf-8")
+        return self.segment_filing().toc
 
-        soup = BeautifulSoup(html_content, "html.parser")
-        toc_table_tag = soup.find("table", recursive=True)
+    def segment_filing(self) -> "FilingSegmentation":
+        """
+        Segment the cleaned filing HTML into the Items of the filing in a single pass.
 
-        toc: list[str] = []
-        if toc_table_tag:
-            for row in toc_table_tag.find_all("tr"):
-                row_text = " ".join(cell.get_text(strip=True) for cell in row.find_all("td"))
-                row_text = re.sub(r"\d+\s*$", "", row_text).strip()  # Remove trailing numbers
-                row_text = re.sub(r"\s+", " ", row_text)
-                if row_text.strip() == "Page" or not row_text.strip():
+        The table of contents is extracted from the first table, and the top-level tags of
+        the body are walked once. A tag that starts with e.g. 'Item 1A.' starts a new section,
+        and a tag that starts with e.g. 'PART II' sets the part for the following Items,
+        which distinguishes Items with the same number in 10-Q filings.
+        Tags that contain tables are ignored. The result is cached on the parser.
+        """
+        with self._lock:
+            if self._segmentation is not None:
+                return self._segmentation
+
+            start = time.time()
+            soup = self._get_soup()
+
+            toc: list[str] = []
+            toc_table_tag = soup.find("table", recursive=True)
+            if toc_table_tag:
+                for row in toc_table_tag.find_all("tr"):
+                    row_text = " ".join(cell.get_text(strip=True) for cell in row.find_all("td"))
+                    row_text = re.sub(r"\d+\s*$", "", row_text).strip()  # Remove trailing numbers
+                    row_text = re.sub(r"\s+", " ", row_text)
+                    if row_text.strip() == "Page" or not row_text.strip():
+                        continue
+                    toc.append(row_text)
+
+            sections: list[FilingSection] = []
+            current: FilingSection | None = None
+            part: str | None = None
+            body = soup.body or soup
+            for tag in body.find_all(True, recursive=False):
+                if tag.find("table"):
+                    continue
+                tag_text = tag.text.strip()
+                part_match = PART_HEADING_PATTERN.match(tag_text)
+                if part_match and len(tag_text) <= MAX_HEADING_LENGTH:
+                    part = part_match.group(1).upper()
+
+                item_match = ITEM_HEADING_PATTERN.match(tag_text)
+                if (
+                    tag.name in ["div", "p"]
+                    and item_match
+                    and len(tag_text) <= MAX_HEADING_LENGTH
+                    and (current is None or (part, item_match.group(1).upper()) != current.key)
+                ):
+                    current = FilingSection(
+                        part=part,
+                        item=item_match.group(1).upper(),
+                        heading=re.sub(r"\s+", " ", tag_text),
+                        text=tag.get_text(strip=True) + "\n",
+                    )
+                    sections.append(current)
                     continue
-                toc.append(row_text)
 
-        return toc
+                if current is not None:
+                    # Strip out any leading whitespace directly after a newline
+                    current.text += re.sub(r"\n\s+", "\n", tag.get_text(strip=True) + "\n")
 
-    def extract_section_from_html(self, heading: str, next_heading: str) -> str:
-        """
-        Extract a section from the filing HTML between two headings.
+            self._segmentation = FilingSegmentation(toc=toc, sections=sections)
+            self._segmentation.save(get_section_index_path(self.filing_html_path))
+            logger.info(
+                f"Segmented filing into {len(sections)} sections in {time.time() - start:.1f} seconds"
+            )
+            return self._segmentation
 
-        The section is saved as a Markdown file with a suffix based on the heading,
-        and also returned as a string.
 
-        This method is meant to be used for:
-        - Management's Discussion and Analysis
-        - Risk Factors
+@dataclass
+class FilingSection:
+    part: str | None
+    item: str
+    heading: str
+    text: str
+
+    @property
+    def key(self) -> tuple[str | None, str]:
+        """The part and Item number that identify the section."""
+        return (self.part, self.item)
+
+
+@dataclass
+class FilingSegmentation:
+    """The table of contents and every Item section of a filing."""
+
+    toc: list[str]
+    sections: list[FilingSection]
+
+    def get_section(self, item: str, part: str | None = None) -> FilingSection | None:
+        """Returns the section for the given Item number, e.g. '1A', optionally within a part."""
+        for section in self.sections:
+            if section.item == item.upper() and (part is None or section.part == part.upper()):
+                return section
+        return None
+
+    def find_section(self, name: str) -> FilingSection | None:
         """
-        if self.filing_html_path is None:
-            raise ValueError("Must download filing before extracting table of contents")
-        start = time.time()
-        html_content = self.filing_cleaned_html_path.read_text(encoding="utf-8")
+        Returns the section with the given name, e.g. 'Risk Factors'.
+
+        The name is first looked up in the table of contents to find the Item number and part,
+        and then in the section headings.
+        """
+        part: str | None = None
+        for heading in self.toc:
+            part_match = PART_HEADING_PATTERN.match(heading)
+            if part_match:
+                part = part_match.group(1).upper()
+            item_match = ITEM_HEADING_PATTERN.match(heading)
+            if item_match and name in heading:
+                section = self.get_section(item_match.group(1), part) or self.get_section(
+                    item_match.group(1)
+                )
+                if section:
+                    return section
+
+        for section in self.sections:
+            if name.upper() in section.heading.upper():
+                return section
+        return None
+
+    def save(self, index_path: Path) -> None:
+        """
+        Persist the segmentation as a section index next to the filing.
 
-        soup = BeautifulSoup(html_content, "html.parser")
+        The section texts are concatenated into a Markdown file, and the JSON index stores
+        the table of contents and the character offsets of each section in that file.
+        """
+        text_path = index_path.with_suffix(".md")
+        sections = []
+        offset = 0
+        for section in self.sections:
+            sections.append(
+                dict(
+                    part=section.part,
+                    item=section.item,
+                    heading=section.heading,
+                    start=offset,
+                    end=offset + len(section.text),
+                )
+            )
+            offset += len(section.text)
 
-        heading_div = soup.find(
-            lambda tag: tag.name in ["div", "p"]
-            and heading.upper() == tag.text.strip().upper()
-            and tag.parent.name == "body"
+        text_path.write_text("".join(s.text for s in self.sections), encoding="utf-8", newline="")
+        index = dict(
+            version=SECTION_INDEX_VERSION, text_file=text_path.name, toc=self.toc, sections=sections
         )
-        # If not found try with only the heading before the first period, including the period
-        heading_item = (heading.partition(".")[0] + ".").upper()
-        next_heading_item = (next_heading.partition(".")[0] + ".").upper()
-        if not heading_div:
-            heading_div = soup.find(
-                lambda tag: tag.name in ["div", "p"]
-                and tag.text.strip().upper().startswith(heading_item)
-                and tag.parent.name == "body"
+        index_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+        logger.info(f"Section index stored at: {index_path}")
+
+    @classmethod
+    def load(cls, index_path: Path) -> "FilingSegmentation | None":
+        """
+        Load a persisted section index, slicing each section directly from the extracted text.
+
+        Returns None if the index does not exist or was created by an older version of the parser.
+        """
+        if not index_path.exists():
+            return None
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+        text_path = index_path.with_name(index.get("text_file", ""))
+        if index.get("version") != SECTION_INDEX_VERSION or not text_path.is_file():
+            return None
+
+        # Read without newline translation so that the character offsets are preserved
+        with open(text_path, encoding="utf-8", newline="") as f:
+            text = f.read()
+        sections = [
+            FilingSection(
+                part=section["part"],
+                item=section["item"],
+                heading=section["heading"],
+                text=text[section["start"] : section["end"]],
             )
+            for section in index["sections"]
+        ]
+        return cls(toc=index["toc"], sections=sections)
 
-        # Extract all text between heading and next_heading, and ignore tables
-        section_text = heading_div.get_text(strip=True) + "\n"
-        if heading_div:
-            for tag in heading_div.find_next_siblings():
-                table_tag = tag.find("table")
-                if table_tag:
-                    continue
-                if next_heading.upper() == tag.text.strip().upper() or (
-                    next_heading_item and tag.text.strip().upper().startswith(next_heading_item)
-                ):
-                    break
-                tag_text = tag.get_text(strip=True) + "\n"
-                # Strip out any leading whitespace directly after a newline
-                tag_text = re.sub(r"\n\s+", "\n", tag_text)
-                section_text += tag_text
-
-        # Get the suffix for the section filename based on the heading
-        suffix = heading.lower().replace(" ", "").split(".")[0]
-        for key, value in SECTION_FILENAME_MAP.items():
-            if value in heading:
-                suffix = key
-                break
-
-        filename = self.filing_html_path.stem + f"_{suffix}.md"
-        filing_markdown_section_path = self.filing_html_path.with_name(filename)
-        filing_markdown_section_path.write_text(section_text, encoding="utf-8")
-        logger.info(f"Section stored as Markdown at: {filing_markdown_section_path}")
-        logger.info(f"Time spent to extract section: {time.time() - start:.1f} seconds")
-
-        return section_text
+
+def get_section_index_path(filing_html_path: Path) -> Path:
+    """Returns the path of the persisted section index for the given filing HTML document."""
+    return filing_html_path.with_suffix(".sections.json")
+
+
+SEC_HTML_CLEANERS = ["bs4", "lxml"]
+# Whitespace handling in BeautifulSoup that is replicated in the lxml cleaner
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+WHITESPACE_PRESERVING_TAGS = ["pre", "textarea"]
+
+# Character substitutions performed on the cleaned HTML in a single pass
+CHARACTER_TRANSLATION = str.maketrans(
+    {
+        "\u00a0": " ",  # Non-breaking space
+        "\u2018": "'",  # Left single quote
+        "\u2019": "'",  # Right single quote
+        "\u201c": '"',  # Left double quote
+        "\u201d": '"',  # Right double quote
+        "\u2013": "-",  # En dash
+        "\u2014": "-",  # Em dash
+    }
+)
+
+
+def clean_filing_html(html_content: str, cleaner: str = "bs4") -> str:
+    """
+    Clean the HTML content of an SEC filing. See SECFilingParser._clean_html_filing for the methodology.
+
+    Args:
+        html_content: The raw HTML content of the filing
+        cleaner: 'bs4' walks the tree several times with BeautifulSoup and the html.parser backend.
+            'lxml' performs the same cleaning steps in a single traversal of an lxml tree.
+    """
+    html_content = unicodedata.normalize("NFKD", html_content)  # Normalize unicode characters
+    if cleaner == "bs4":
+        cleaned_html = _clean_html_bs4(html_content)
+    elif cleaner == "lxml":
+        cleaned_html = _clean_html_lxml(html_content)
+    else:
+        raise ValueError(f"Unknown SEC HTML cleaner '{cleaner}'. Choose from {SEC_HTML_CLEANERS}")
+
+    cleaned_html = re.sub(r"\n{3,}", "\n\n", cleaned_html)  # Remove extra newlines
+    # Non-breaking spaces are replaced before the bullet points, as they may follow a bullet point
+    cleaned_html = cleaned_html.translate(CHARACTER_TRANSLATION)
+    cleaned_html = re.sub(r"\u2022\s?", "- ", cleaned_html)  # Bullet point
+    return cleaned_html
+
+
+def _clean_html_bs4(html_content: str) -> str:
+    """Clean the filing HTML with BeautifulSoup and return the serialized HTML."""
+    soup = BeautifulSoup(html_content, "html.parser")
+
+    # ix: tags represent inline XBRL tags, which we can remove
+    for tag in soup.find_all(re.compile(r"^(ix|xbrli):")):
+        tag.unwrap()
+
+    for tag in soup.find_all(True):
+        del tag["style"]
+
+    # Find the tag that represents the heading for the table of contents
+    toc_div = soup.find(
+        lambda tag: tag.name in ["div", "p", "span"]
+        and tag.text.strip() in ["TABLE OF CONTENTS", "INDEX", "Table of Contents"]
+        and not tag.find("a")
+    )
+
+    if toc_div:
+        # Remove all tags before the previous <hr> tag as they represent the first page
+        hr_tag = toc_div.find_previous("hr")
+        for sibling in hr_tag.find_previous_siblings(True):
+            sibling.decompose()
+
+    for tag in soup.find_all("span"):
+        tag.unwrap()
+    # Remove any div tags that are empty and have an id attribute
+    for div_tag in soup.find_all("div", id=True):
+        if not div_tag.text.strip():
+            div_tag.decompose()
+
+    # Remove all hr (horizontal line) tags and the single tag before and after it
+    for hr_tag in soup.find_all("hr"):
+        prev_tag = hr_tag.find_previous_sibling()
+        if prev_tag:
+            prev_tag.decompose()
+        next_tag = hr_tag.find_next_sibling()
+        if next_tag:
+            next_tag.decompose()
+        hr_tag.decompose()
+
+    return str(soup)
+
+
+def _clean_html_lxml(html_content: str) -> str:
+    """
+    Clean the filing HTML with lxml in a single traversal and return the serialized HTML.
+
+    Inline styles are removed, whitespace-only text is collapsed as in BeautifulSoup, and the tags
+    to unwrap or remove are collected while walking the tree once. The tree is then modified in the same order as in _clean_html_bs4.
+    Removed tags keep their trailing text, as with BeautifulSoup.
+
+    The output is equivalent to _clean_html_bs4, but not byte-identical:
+
+    - The XML declaration is dropped, and void tags are serialized as e.g. `<br>` instead of `<br/>`.
+    - libxml2 repairs invalid markup (e.g. a `<div>` inside a `<p>`) where html.parser keeps it.
+    - A table of contents heading without a preceding `<hr>` tag is ignored
+      instead of raising an error.
+    """
+    import lxml.html
+
+    root = lxml.html.document_fromstring(
+        html_content.encode("utf-8"), parser=lxml.html.HTMLParser(encoding="utf-8")
+    )
+
+    xbrl_tags = []
+    span_tags = []
+    div_tags = []
+    hr_tags = []
+    toc_hr_tag = None
+    toc_found = False
+    for tag in root.iter():
+        parent = tag.getparent()
+        if tag.tail and parent is not None and parent.tag not in WHITESPACE_PRESERVING_TAGS:
+            tag.tail = _collapse_whitespace(tag.tail)
+        if not isinstance(tag.tag, str):  # Comments and processing instructions
+            continue
+        if tag.text and tag.tag not in WHITESPACE_PRESERVING_TAGS:
+            tag.text = _collapse_whitespace(tag.text)
+        tag.attrib.pop("style", None)
+        if tag.tag.startswith(("ix:", "xbrli:")):
+            xbrl_tags.append(tag)
+        elif tag.tag == "hr":
+            hr_tags.append(tag)
+            if not toc_found:
+                toc_hr_tag = tag
+        elif tag.tag == "span":
+            span_tags.append(tag)
+        elif tag.tag == "div" and tag.get("id") is not None:
+            div_tags.append(tag)
+
+        # Find the tag that represents the heading for the table of contents
+        if (
+            not toc_found
+            and tag.tag in ["div", "p", "span"]
+            and tag.text_content().strip() in ["TABLE OF CONTENTS", "INDEX", "Table of Contents"]
+            and next(tag.iterdescendants("a"), None) is None
+        ):
+            toc_found = True
+
+    # ix: tags represent inline XBRL tags, which we can remove
+    for tag in xbrl_tags:
+        _drop_tag(tag)
+
+    if toc_found and toc_hr_tag is not None:
+        # Remove all tags before the previous <hr> tag as they represent the first page
+        for sibling in list(_iter_tag_siblings(toc_hr_tag, preceding=True)):
+            _drop_tree(sibling)
+
+    for tag in span_tags:
+        _drop_tag(tag)
+    # Remove any div tags that are empty and have an id attribute
+    for div_tag in div_tags:
+        if not div_tag.text_content().strip():
+            _drop_tree(div_tag)
+
+    # Remove all hr (horizontal line) tags and the single tag before and after it
+    for hr_tag in hr_tags:
+        if hr_tag.getparent() is None:  # Already removed as the sibling of another <hr> tag
+            continue
+        prev_tag = next(_iter_tag_siblings(hr_tag, preceding=True), None)
+        if prev_tag is not None:
+            _drop_tree(prev_tag)
+        next_tag = next(_iter_tag_siblings(hr_tag, preceding=False), None)
+        if next_tag is not None:
+            _drop_tree(next_tag)
+        _drop_tree(hr_tag)
+
+    return lxml.html.tostring(root, encoding="unicode")
+
+
+def _collapse_whitespace(text: str) -> str:
+    """Collapse whitespace-only text to a single newline or space, as done by BeautifulSoup."""
+    if text.strip(ASCII_SPACES):
+        return text
+    return "\n" if "\n" in text else " "
+
+
+def _iter_tag_siblings(tag: Any, preceding: bool) -> Iterator[Any]:
+    """Iterate over the sibling tags of an lxml element, skipping comments."""
+    return (
+        sibling for sibling in tag.itersiblings(preceding=preceding) if isinstance(sibling.tag, str)
+    )
+
+
+def _drop_tag(tag: Any) -> None:
+    """Unwrap an lxml element, unless it has already been removed from the tree."""
+    if tag.getparent() is not None:
+        tag.drop_tag()
+
+
+def _drop_tree(tag: Any) -> None:
+    """Remove an lxml element but keep its trailing text, unless it has already been removed."""
+    if tag.getparent() is not None:
+        tag.drop_tree()
 
 
 def table_to_markdown(table_tag: Tag) -> str:
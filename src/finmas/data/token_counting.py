@@ -15,6 +15,25 @@ token_counter = TokenCountingHandler(
 Settings.callback_manager = CallbackManager([token_counter])
 
 
+def get_embedding_token_count(index, embed_model=None) -> int:
+    """
+    Returns the number of tokens in the node texts that are embedded for a vector store index.
+
+    The count is computed from the index itself, so it is correct when several
+    indexes are created concurrently. When the embedding model caches embeddings,
+    only the tokens of the texts that were not found in the cache are counted.
+    """
+    from llama_index.core.schema import MetadataMode
+
+    if hasattr(embed_model, "cache_miss_token_count"):
+        return embed_model.cache_miss_token_count
+
+    return sum(
+        len(token_counter.tokenizer(node.get_content(metadata_mode=MetadataMode.EMBED)))
+        for node in index.docstore.docs.values()
+    )
+
+
 def get_token_counter_as_string(llm_model: str | None = None) -> str:
     """Returns a string representation of the token counter."""
     output = (
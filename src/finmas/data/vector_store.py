@@ -0,0 +1,92 @@
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Any
+
+from finmas.constants import defaults
+from finmas.logger import get_logger
+
+logger = get_logger(__name__)
+
+FINGERPRINT_FILENAME = "fingerprint.json"
+
+
+def get_index_fingerprint(
+    documents: list, embedding_model: str, chunk_size: int, chunk_overlap: int
+) -> str:
+    """
+    Returns a fingerprint of the documents and the settings used to create a vector store index.
+
+    The fingerprint changes whenever the source text, the document metadata, the embedding model,
+    or the chunking settings change.
+
+    Args:
+        documents: The llama-index documents that are indexed
+        embedding_model: Name of the embedding model
+        chunk_size: Chunk size in tokens
+        chunk_overlap: Chunk overlap in tokens
+    """
+    hasher = hashlib.sha256()
+    settings = dict(
+        embedding_model=embedding_model, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+    hasher.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    for document in documents:
+        hasher.update(json.dumps(document.metadata, sort_keys=True, default=str).encode("utf-8"))
+        hasher.update(document.text.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def load_or_create_vector_store_index(
+    documents: list, embed_model: Any, embedding_model: str, persist_dir: str
+) -> tuple[Any, bool]:
+    """
+    Load a persisted vector store index, or create and persist a new one.
+
+    The persisted index is reused when the fingerprint stored alongside it matches the
+    fingerprint of the documents and index settings. Otherwise the persist directory
+    is wiped and the index is created from scratch.
+
+    Args:
+        documents: The llama-index documents to index
+        embed_model: The llama-index embedding model
+        embedding_model: Name of the embedding model
+        persist_dir: Directory where the index is persisted
+
+    Returns:
+        Tuple of the vector store index and whether it was loaded from storage.
+    """
+    from llama_index.core import Settings, StorageContext, VectorStoreIndex, load_index_from_storage
+
+    fingerprint = get_index_fingerprint(
+        documents,
+        embedding_model=embedding_model,
+        chunk_size=Settings.chunk_size,
+        chunk_overlap=Settings.chunk_overlap,
+    )
+    fingerprint_file = Path(persist_dir) / FINGERPRINT_FILENAME
+
+    if defaults["vector_store_index_reuse"] and fingerprint_file.exists():
+        stored_fingerprint = json.loads(fingerprint_file.read_text(encoding="utf-8"))
+        if stored_fingerprint.get("fingerprint") == fingerprint:
+            try:
+                storage_context = StorageContext.from_defaults(persist_dir=persist_dir)
+                index = load_index_from_storage(storage_context, embed_model=embed_model)
+                logger.info(f"Loaded Vector Store Index from '{persist_dir}'")
+                return (index, True)
+            except Exception as e:
+                logger.warning(f"Could not load Vector Store Index from '{persist_dir}': {e}")
+
+    if Path(persist_dir).exists():
+        shutil.rmtree(persist_dir)
+    Path(persist_dir).mkdir(parents=True, exist_ok=True)
+
+    index = VectorStoreIndex.from_documents(documents, embed_model=embed_model)
+    index.storage_context.persist(persist_dir=persist_dir)
+    fingerprint_file.write_text(
+        json.dumps({"fingerprint": fingerprint, "embedding_model": embedding_model}),
+        encoding="utf-8",
+    )
+
+    return (index, False)
@@ -26,6 +26,7 @@ from finmas.crews.utils import (
     save_crew_output,
 )
 from finmas.data.market.fundamentals import NUM_QUARTERS, get_ticker_essentials
+from finmas.data.market.screener import screen_tickers
 from finmas.data.market.technical_analysis import get_technical_indicators
 from finmas.data.news import get_news_fetcher
 from finmas.data.news.query_engine import get_news_query_engine
@@ -125,6 +126,12 @@ class FinMAS(pn.viewable.Viewer):
     only_sp500_tickers = pn.widgets.Checkbox(
         name="SP500 Tickers", value=defaults["only_sp500_tickers"]
     )
+    screener_query = pn.widgets.TextInput(
+        name="Screener Query",
+        placeholder="pe_ttm < 20 and revenue_ttm_yoy > 10",
+        width=500,
+    )
+    screener_alert = pn.pane.Alert("", alert_type="danger", visible=False)
     filing_types = pn.widgets.MultiSelect(
         name="Filing Types",
         value=defaults["sec_filing_types_selected"],
@@ -198,6 +205,7 @@ class FinMAS(pn.viewable.Viewer):
         self.active_ticker = ""
         self.update_tickers_tbl(None)
         self.only_sp500_tickers.param.watch(self.update_tickers_tbl, "value")
+        self.screener_query.param.watch(self.update_tickers_tbl, "value")
 
         self.fetch_data_btn.on_click(self.fetch_data)
         self.fetch_data(None)
@@ -250,8 +258,16 @@ class FinMAS(pn.viewable.Viewer):
         self.crew_tasks_config_md.object = get_yaml_config_as_markdown(config_path, "tasks", inputs)
 
     def update_tickers_tbl(self, event):
-        """Set the tickers table."""
+        """Set the tickers table, filtered by the screener query when it is given."""
         df = get_tickers_df(sp500=self.only_sp500_tickers.value)
+        self.screener_alert.visible = False
+        if self.screener_query.value:
+            try:
+                screener_df = screen_tickers(self.screener_query.value)
+                df = df.merge(screener_df.reset_index(), on="ticker", how="inner")
+            except Exception as e:
+                self.screener_alert.object = f"Invalid screener query: {e}"
+                self.screener_alert.visible = True
         selection = df.index[df["ticker"] == self.ticker_select.value].tolist()
         if getattr(self, "tickers_tbl", None) is None:
             self.tickers_tbl = pn.widgets.Tabulator(
@@ -744,9 +760,14 @@ class FinMAS(pn.viewable.Viewer):
                         pn.Column(
                             pn.pane.Markdown(
                                 "Select a ticker. "
-                                "Use the filters to explore and find the desired ticker.",
+                                "Use the filters to explore and find the desired ticker. "
+                                "The screener query filters the tickers in the local "
+                                "fundamentals store on metrics such as `pe_ttm`, `ps_ttm`, "
+                                "`de` and `revenue_ttm_yoy`.",
                                 margin=0,
                             ),
+                            self.screener_query,
+                            self.screener_alert,
                             self.tickers_tbl,
                         ),
                     ),
@@ -1,7 +1,6 @@
 import datetime as dt
 import os
 import re
-import shutil
 from pathlib import Path
 
 import financedatabase as fd
@@ -26,6 +25,9 @@ def get_vector_store_index_dir(ticker: str, data_type: str, subfolder: str | Non
     """
     Get the directory of the vector store index.
 
+    The directory is created if it does not exist. Any persisted index inside the
+    directory is kept so that it can be reused.
+
     Args:
         ticker: The ticker of the stock
         data_type: The type of data (e.g. news, sec, etc.)
@@ -35,8 +37,6 @@ def get_vector_store_index_dir(ticker: str, data_type: str, subfolder: str | Non
     if subfolder:
         index_dir = index_dir / subfolder
 
-    if Path(index_dir).exists():
-        shutil.rmtree(index_dir)
     Path(index_dir).mkdir(parents=True, exist_ok=True)
 
     return str(index_dir)
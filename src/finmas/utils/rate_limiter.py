@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import deque
+
+
+class SlidingWindowRateLimiter:
+    """
+    Thread-safe rate limiter that allows at most a number of requests in any window of time.
+
+    Unlike a token bucket, a burst of requests never makes the number of requests
+    in a window exceed the limit, e.g. a limit of requests per minute set by an API.
+    """
+
+    def __init__(self, max_requests: int, window: float = 60.0) -> None:
+        """
+        Initialize the SlidingWindowRateLimiter class.
+
+        Args:
+            max_requests: Maximum number of requests in the window
+            window: Length of the window in seconds
+        """
+        if max_requests <= 0:
+            raise ValueError("The maximum number of requests must be positive")
+        self.max_requests = max_requests
+        self.window = window
+        self._timestamps: deque[float] = deque()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Acquire a request slot, waiting until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._timestamps and self._timestamps[0] <= now - self.window:
+                    self._timestamps.popleft()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if len(self._timestamps) < self.max_requests:
+                        self._timestamps.append(now)
+                        return
+                    wait = self._timestamps[0] + self.window - now
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Delay all requests, e.g. when the server signals throttling."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
@@ -0,0 +1,88 @@
+from collections.abc import Callable
+
+import pandas as pd
+import pytest
+
+from finmas.data.market import alpha_vantage
+from finmas.data.market.alpha_vantage import AlphaVantageRateLimitError, parse_rate_limit_error
+
+DAILY_LIMIT_MESSAGE = (
+    "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day. "
+    "Please subscribe to any of the premium plans at https://www.alphavantage.co/premium/ "
+    "to instantly remove all daily rate limits."
+)
+MINUTE_LIMIT_MESSAGES = [
+    (
+        "Thank you for using Alpha Vantage! Our standard API rate limit is 5 requests per minute "
+        "and 25 requests per day. Please subscribe to any of the premium plans at "
+        "https://www.alphavantage.co/premium/ to instantly remove all daily rate limits."
+    ),
+    (
+        "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute "
+        "and 500 calls per day. Please visit https://www.alphavantage.co/premium/ if you would "
+        "like to target a higher API call frequency."
+    ),
+    (
+        "Thank you for using Alpha Vantage! Please consider spreading out your free API requests "
+        "more sparingly (1 request per second). You may subscribe to any of the premium plans at "
+        "https://www.alphavantage.co/premium/ to lift the free key rate limit (25 requests per day) "
+        "and instantly remove all daily rate limits."
+    ),
+]
+INVALID_CALL_MESSAGE = (
+    "Invalid API call. Please retry or visit the documentation "
+    "(https://www.alphavantage.co/documentation/) for INCOME_STATEMENT."
+)
+
+
+def test_daily_limit_message():
+    error = parse_rate_limit_error(DAILY_LIMIT_MESSAGE)
+    assert error is not None
+    assert error.daily_limit
+
+
+@pytest.mark.parametrize("message", MINUTE_LIMIT_MESSAGES)
+def test_minute_limit_message_is_not_daily_limit(message):
+    error = parse_rate_limit_error(message)
+    assert error is not None
+    assert not error.daily_limit
+
+
+def test_other_errors_are_not_rate_limits():
+    assert parse_rate_limit_error(INVALID_CALL_MESSAGE) is None
+
+
+class FakeFundamentalData:
+    message = ""
+
+    def __init__(self, output_format: str) -> None:
+        pass
+
+    def __getattr__(self, name: str) -> Callable[[str], tuple[pd.DataFrame, None]]:
+        def get_data(ticker: str) -> tuple[pd.DataFrame, None]:
+            raise ValueError(self.message)
+
+        return get_data
+
+
+@pytest.mark.parametrize(
+    ("message", "daily_limit"),
+    [(DAILY_LIMIT_MESSAGE, True), *((message, False) for message in MINUTE_LIMIT_MESSAGES)],
+)
+def test_fetch_fundamental_data_raises_rate_limit_error(monkeypatch, message, daily_limit):
+    monkeypatch.setattr(FakeFundamentalData, "message", message)
+    monkeypatch.setattr(alpha_vantage, "FundamentalData", FakeFundamentalData)
+    monkeypatch.setattr(alpha_vantage.rate_limiter, "acquire", lambda: None)
+
+    with pytest.raises(AlphaVantageRateLimitError) as exc_info:
+        alpha_vantage.fetch_fundamental_data("AAPL", "income", "Quarterly")
+    assert exc_info.value.daily_limit == daily_limit
+
+
+def test_fetch_fundamental_data_reraises_other_errors(monkeypatch):
+    monkeypatch.setattr(FakeFundamentalData, "message", INVALID_CALL_MESSAGE)
+    monkeypatch.setattr(alpha_vantage, "FundamentalData", FakeFundamentalData)
+    monkeypatch.setattr(alpha_vantage.rate_limiter, "acquire", lambda: None)
+
+    with pytest.raises(ValueError, match="Invalid API call"):
+        alpha_vantage.fetch_fundamental_data("AAPL", "income", "Quarterly")
@@ -0,0 +1,105 @@
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+from finmas.data.market import price_store, tiingo
+from finmas.data.market.price_store import get_missing_ranges
+
+START = pd.Timestamp("2025-01-01")
+END = pd.Timestamp("2025-06-30")
+
+
+def get_coverage(updated_minutes_ago: int) -> dict:
+    updated = dt.datetime.now() - dt.timedelta(minutes=updated_minutes_ago)
+    return dict(
+        start=START,
+        end=END,
+        updated=updated.isoformat(timespec="seconds"),
+        provisional_end=END + pd.Timedelta(days=1),
+    )
+
+
+@pytest.fixture(autouse=True)
+def today_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(price_store.defaults, "price_today_ttl_minutes", 15)
+
+
+def test_fresh_provisional_end_is_covered():
+    coverage = get_coverage(updated_minutes_ago=5)
+    assert get_missing_ranges(coverage, START, END + pd.Timedelta(days=1)) == []
+
+
+def test_expired_provisional_end_is_fetched_again():
+    coverage = get_coverage(updated_minutes_ago=30)
+    today = END + pd.Timedelta(days=1)
+    assert get_missing_ranges(coverage, START, today) == [(today, today)]
+
+
+def test_missing_head_and_tail():
+    coverage = dict(start=START, end=END, updated=dt.datetime.now().isoformat())
+    start, end = START - pd.Timedelta(days=10), END + pd.Timedelta(days=3)
+    assert get_missing_ranges(coverage, start, end) == [
+        (start, START - pd.Timedelta(days=1)),
+        (END + pd.Timedelta(days=1), end),
+    ]
+
+
+class FakeTiingo:
+    """Daily bars from Tiingo, where a 2:1 split on the split date adjusts the earlier bars."""
+
+    def __init__(self, split_date: pd.Timestamp | None = None) -> None:
+        self.split_date = split_date
+        self.requests: list[tuple[str, str]] = []
+
+    def fetch_price_data(self, ticker: str, start: dt.date, end: dt.date) -> pd.DataFrame:
+        """Returns the bars from start to end and records the request."""
+        self.requests.append((str(start), str(end)))
+        index = pd.bdate_range(start, end, name="date")
+        close = pd.Series(100.0, index=index)
+        splitfactor = pd.Series(1.0, index=index)
+        adjclose = close.copy()
+        if self.split_date is not None:
+            close[index >= self.split_date] = 50.0
+            splitfactor[index == self.split_date] = 2.0
+            adjclose[:] = 50.0
+        return pd.DataFrame(
+            {"close": close, "adjclose": adjclose, "divcash": 0.0, "splitfactor": splitfactor}
+        )
+
+
+@pytest.fixture
+def price_store_dir(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    monkeypatch.setitem(price_store.defaults, "price_store_dir", str(tmp_path))
+    monkeypatch.setitem(price_store.defaults, "price_store_float32", False)
+    monkeypatch.setenv("TIINGO_API_KEY", "test")
+
+
+@pytest.mark.usefixtures("price_store_dir")
+def test_split_in_tail_segment_refetches_full_history(monkeypatch: pytest.MonkeyPatch):
+    fake_tiingo = FakeTiingo()
+    monkeypatch.setattr(tiingo, "fetch_price_data", fake_tiingo.fetch_price_data)
+    tiingo.get_price_data("TEST", START, END)
+
+    fake_tiingo.split_date = pd.Timestamp("2025-07-10")
+    df = tiingo.get_price_data("TEST", START, pd.Timestamp("2025-07-31"))
+
+    assert fake_tiingo.requests[1] == ("2025-06-30", "2025-07-31")
+    assert fake_tiingo.requests[2] == ("2025-01-01", "2025-07-31")
+    assert (df["adjclose"] == 50.0).all()
+    assert df.loc["2025-07-10", "splitfactor"] == 2.0
+
+
+@pytest.mark.usefixtures("price_store_dir")
+def test_tail_segment_without_split_is_appended(monkeypatch: pytest.MonkeyPatch):
+    fake_tiingo = FakeTiingo()
+    monkeypatch.setattr(tiingo, "fetch_price_data", fake_tiingo.fetch_price_data)
+    tiingo.get_price_data("TEST", START, END)
+    df = tiingo.get_price_data("TEST", START, pd.Timestamp("2025-07-31"))
+
+    assert fake_tiingo.requests == [
+        ("2025-01-01", "2025-06-30"),
+        ("2025-06-30", "2025-07-31"),
+    ]
+    assert df.index.is_unique
+    assert df.index.max() == pd.Timestamp("2025-07-31")
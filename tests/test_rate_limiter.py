@@ -0,0 +1,49 @@
+import threading
+import time
+
+from finmas.utils.rate_limiter import SlidingWindowRateLimiter
+
+# Slack for the time between acquiring a request slot and recording the timestamp
+TIMING_SLACK = 0.02
+
+
+def acquire_concurrently(
+    rate_limiter: SlidingWindowRateLimiter, num_threads: int, num_requests: int
+) -> list[float]:
+    timestamps: list[float] = []
+    lock = threading.Lock()
+
+    def worker() -> None:
+        for _ in range(num_requests):
+            rate_limiter.acquire()
+            with lock:
+                timestamps.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(timestamps)
+
+
+def get_max_requests_in_window(timestamps: list[float], window: float) -> int:
+    return max(
+        sum(1 for other in timestamps if timestamp <= other < timestamp + window - TIMING_SLACK)
+        for timestamp in timestamps
+    )
+
+
+def test_sliding_window_limits_requests_in_any_second():
+    rate_limiter = SlidingWindowRateLimiter(max_requests=8, window=1)
+    timestamps = acquire_concurrently(rate_limiter, num_threads=8, num_requests=3)
+    assert len(timestamps) == 24
+    assert get_max_requests_in_window(timestamps, window=1) <= 8
+
+
+def test_pause_delays_all_requests():
+    rate_limiter = SlidingWindowRateLimiter(max_requests=8, window=1)
+    start = time.monotonic()
+    rate_limiter.pause(0.5)
+    timestamps = acquire_concurrently(rate_limiter, num_threads=4, num_requests=1)
+    assert min(timestamps) - start >= 0.5
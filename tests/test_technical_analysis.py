@@ -0,0 +1,93 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from finmas.data.market import technical_analysis
+from finmas.data.market.technical_analysis import (
+    NUM_PERIODS,
+    get_technical_indicators,
+    get_technical_indicators_online,
+    get_technical_indicators_panel,
+)
+
+INDICATOR_COLS = ["close", "sma_20", "sma_50", "sma_trend", "rsi_14", "bb_pband", "ret_1w"]
+
+
+def get_daily_prices(seed: int, start: str, end: str = "2024-12-31") -> pd.DataFrame:
+    """Returns synthetic daily prices as a random walk on business days."""
+    index = pd.bdate_range(start, end, name="date")
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index))))
+    return pd.DataFrame(
+        {
+            "open": close * 0.99,
+            "high": close * 1.01,
+            "low": close * 0.98,
+            "close": close,
+            "volume": rng.integers(100_000, 1_000_000, len(index)),
+        },
+        index=index,
+    )
+
+
+PRICES = {
+    "AAA": get_daily_prices(seed=1, start="2020-01-01"),
+    "BBB": get_daily_prices(seed=2, start="2020-01-01"),
+    # A shorter history, so that the panel has missing values for this ticker
+    "CCC": get_daily_prices(seed=3, start="2022-03-15"),
+}
+
+
+def fake_get_price_data(ticker: str, start: dt.date | str, end: dt.date | str) -> pd.DataFrame:
+    """Returns the synthetic prices of the ticker from start to end."""
+    return PRICES[ticker].loc[pd.Timestamp(start) : pd.Timestamp(end)]
+
+
+@pytest.fixture(autouse=True)
+def synthetic_prices(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(technical_analysis, "get_price_data", fake_get_price_data)
+
+
+def test_panel_matches_per_ticker_indicators():
+    close = pd.DataFrame({ticker: df["close"] for ticker, df in PRICES.items()})
+    panel = get_technical_indicators_panel(close)
+
+    for ticker, df in PRICES.items():
+        expected = get_technical_indicators(ticker, df.index[0].date(), df.index[-1].date())
+        expected = expected[INDICATOR_COLS]
+        result = panel.xs(ticker, axis=1, level=1).loc[expected.index, INDICATOR_COLS]
+        pd.testing.assert_frame_equal(result, expected, check_names=False, check_freq=False)
+
+
+class FakeCache(dict):
+    """In-memory stand-in for the diskcache cache of the indicator states."""
+
+    def set(self, key: str, value: object) -> None:
+        """Store the value, as diskcache.Cache.set."""
+        self[key] = value
+
+
+@pytest.mark.parametrize(
+    ("ticker", "first_end", "last_end"),
+    [
+        ("AAA", "2023-06-01", "2024-03-31"),
+        # Starts a few weeks after the first bar, so that the indicators become valid one by one
+        ("CCC", "2022-04-01", "2023-03-31"),
+    ],
+)
+def test_online_indicators_match_batch_after_daily_updates(
+    monkeypatch: pytest.MonkeyPatch, ticker: str, first_end: str, last_end: str
+):
+    monkeypatch.setattr(technical_analysis, "cache", FakeCache())
+    online_cols = INDICATOR_COLS[:-1]
+
+    # The state is created from the history, and then updated one daily bar at a time
+    for end in PRICES[ticker].loc[first_end:last_end].index:
+        result = get_technical_indicators_online(ticker, end=end.date())
+
+        start = (end - pd.DateOffset(years=5)).date()
+        expected = get_technical_indicators(ticker, start=start, end=end.date())
+        expected = expected[online_cols].tail(NUM_PERIODS)
+        pd.testing.assert_frame_equal(result, expected, check_freq=False)